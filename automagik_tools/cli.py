@@ -2,6 +2,7 @@
 CLI for automagik-tools
 """
 
+import asyncio
 import os
 import sys
 from typing import Dict, Any, Optional, List
@@ -21,6 +22,46 @@ stderr_console = Console(stderr=True)
 app = typer.Typer(name="automagik-tools", help="MCP Tools Framework")
 
 
+def use_fast_event_loop() -> bool:
+    """Set up the fastest available event loop for serving tools (opt-in).
+
+    Only active when AUTOMAGIK_TOOLS_FAST_EVENT_LOOP=true, since it changes
+    task scheduling for every tool and for FastMCP/anyio internals. Uses
+    uvloop when it is installed and, on Python 3.12+, asyncio's eager task
+    factory so tasks that finish without suspending skip a scheduling round.
+    Returns True if uvloop is active.
+    """
+    if os.getenv("AUTOMAGIK_TOOLS_FAST_EVENT_LOOP", "false").lower() not in (
+        "1",
+        "true",
+        "yes",
+    ):
+        return False
+
+    try:
+        import uvloop
+
+        policy_cls, using_uvloop = uvloop.EventLoopPolicy, True
+    except ImportError:
+        policy_cls, using_uvloop = asyncio.DefaultEventLoopPolicy, False
+
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is not None:
+
+        class EagerTaskPolicy(policy_cls):
+            def new_event_loop(self):
+                loop = super().new_event_loop()
+                loop.set_task_factory(eager_task_factory)
+                return loop
+
+        policy_cls = EagerTaskPolicy
+    elif not using_uvloop:
+        return False
+
+    asyncio.set_event_loop_policy(policy_cls())
+    return using_uvloop
+
+
 def create_dynamic_openapi_tool(
     openapi_url: str,
     api_key: Optional[str] = None,
@@ -412,6 +453,7 @@ def hub(
             browser_thread.start()
 
             # Run MCP in stdio mode (foreground)
+            use_fast_event_loop()
             hub_server.run(transport="stdio")
 
         except Exception as e:
@@ -502,6 +544,7 @@ def tool(
 
         # Start the server
         os.environ["MCP_TRANSPORT"] = transport
+        use_fast_event_loop()
 
         if transport == "stdio":
             mcp_server.run(transport="stdio", show_banner=False)
@@ -566,6 +609,7 @@ def openapi(
 
         # Start the server
         os.environ["MCP_TRANSPORT"] = transport
+        use_fast_event_loop()
 
         if transport == "stdio":
             mcp_server.run(transport="stdio", show_banner=False)
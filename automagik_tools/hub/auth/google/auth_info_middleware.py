@@ -2,11 +2,14 @@
 Authentication middleware to populate context state with user information
 """
 
+import hashlib
 import jwt
 import logging
 import os
 import time
+from collections import OrderedDict
 from types import SimpleNamespace
+from typing import Any, Dict, Optional, Tuple
 from fastmcp.server.middleware import Middleware, MiddlewareContext
 from fastmcp.server.dependencies import get_http_headers
 
@@ -17,6 +20,45 @@ from automagik_tools.tools.google_workspace.auth.oauth21_session_store import (
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Successful bearer token verifications, so a token reused across tool calls is
+# verified and decoded once. Keyed by the token's SHA-256 (raw tokens are not
+# kept); values are (verified_auth, claims, monotonic deadline).
+_VERIFIED_TOKEN_TTL = 30.0
+_VERIFIED_TOKEN_CACHE_SIZE = 4096
+_verified_tokens: "OrderedDict[str, Tuple[Any, Dict[str, Any], float]]" = OrderedDict()
+
+
+def _token_cache_key(token_str: str) -> str:
+    return hashlib.sha256(token_str.encode()).hexdigest()
+
+
+def _get_verified_token(key: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """Return the cached (verified_auth, claims) for a token key, if still valid."""
+    entry = _verified_tokens.get(key)
+    if entry is None:
+        return None
+    verified_auth, claims, deadline = entry
+    if time.monotonic() >= deadline:
+        _verified_tokens.pop(key, None)
+        return None
+    _verified_tokens.move_to_end(key)
+    return verified_auth, claims
+
+
+def _remember_verified_token(key: str, verified_auth, claims: Dict[str, Any]) -> None:
+    """Cache a successful verification, never past the token's own expiry."""
+    ttl = _VERIFIED_TOKEN_TTL
+    expires_at = getattr(verified_auth, "expires_at", None) or claims.get("exp")
+    if isinstance(expires_at, (int, float)):
+        ttl = min(ttl, expires_at - time.time())
+    if ttl <= 0:
+        return
+
+    _verified_tokens[key] = (verified_auth, claims, time.monotonic() + ttl)
+    _verified_tokens.move_to_end(key)
+    while len(_verified_tokens) > _VERIFIED_TOKEN_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
+
 
 class AuthInfoMiddleware(Middleware):
     """
@@ -53,20 +95,23 @@ class AuthInfoMiddleware(Middleware):
             logger.error(f"Error decoding verified JWT payload: {exc}")
         return {}
 
+    def _verified_claims(self, token_str: str, verified_auth, token_type: str):
+        """Return the claims of a verified token."""
+        if hasattr(verified_auth, "claims") and isinstance(verified_auth.claims, dict):
+            return dict(verified_auth.claims)
+        if token_type != "google_oauth":
+            return self._decode_verified_claims(token_str)
+        return {}
+
     def _store_verified_token(
         self,
         context: MiddlewareContext,
         token_str: str,
         verified_auth,
         token_type: str,
+        claims: Dict[str, Any],
     ):
-        """Populate FastMCP state from a verified token."""
-
-        claims = {}
-        if hasattr(verified_auth, "claims") and isinstance(verified_auth.claims, dict):
-            claims = dict(verified_auth.claims)
-        elif token_type != "google_oauth":
-            claims = self._decode_verified_claims(token_str)
+        """Populate FastMCP state from a verified token and its claims."""
 
         user_email = claims.get("email") or getattr(verified_auth, "email", None)
         if not user_email:
@@ -175,24 +220,41 @@ class AuthInfoMiddleware(Middleware):
                     if token_is_google:
                         logger.debug("Detected Google OAuth access token format")
 
-                    from .core.server import get_auth_provider
-
-                    auth_provider = get_auth_provider()
+                    cache_key = _token_cache_key(token_str)
+                    cached = _get_verified_token(cache_key)
                     verified_auth = None
+                    claims: Dict[str, Any] = {}
 
-                    if auth_provider:
-                        try:
-                            verified_auth = await auth_provider.verify_token(token_str)
-                        except Exception as e:
-                            logger.error(f"Error verifying bearer token: {e}")
+                    if cached:
+                        verified_auth, claims = cached
+                        logger.debug("Using cached bearer token verification")
                     else:
-                        logger.warning(
-                            "No auth provider available to verify bearer tokens"
-                        )
+                        from .core.server import get_auth_provider
+
+                        auth_provider = get_auth_provider()
+
+                        if auth_provider:
+                            try:
+                                verified_auth = await auth_provider.verify_token(
+                                    token_str
+                                )
+                            except Exception as e:
+                                logger.error(f"Error verifying bearer token: {e}")
+                        else:
+                            logger.warning(
+                                "No auth provider available to verify bearer tokens"
+                            )
+
+                        # Only successful verifications are cached
+                        if verified_auth:
+                            claims = self._verified_claims(
+                                token_str, verified_auth, token_type
+                            )
+                            _remember_verified_token(cache_key, verified_auth, claims)
 
                     if verified_auth:
                         self._store_verified_token(
-                            context, token_str, verified_auth, token_type
+                            context, token_str, verified_auth, token_type, claims
                         )
                     elif token_is_google:
                         logger.warning(
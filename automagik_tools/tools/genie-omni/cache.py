@@ -0,0 +1,233 @@
+"""Persistent per-instance WhatsApp contact and group snapshot (SQLite).
+
+`search` reads people and groups from this local snapshot instead of pulling
+every group with all participants over the network on each call. A snapshot
+older than the configured TTL is still served while a background task
+refreshes it from the Omni/Evolution APIs. SQLite work runs in a worker
+thread so a snapshot write never blocks the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wa_contacts (
+    phone TEXT NOT NULL,
+    name TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (instance, phone)
+);
+CREATE TABLE IF NOT EXISTS wa_groups (
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    members_json TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (instance, id)
+);
+CREATE TABLE IF NOT EXISTS wa_snapshots (
+    instance TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+"""
+
+CONTACTS_PAGE_SIZE = 100
+
+
+def snapshot_key(client: Any, instance: str) -> str:
+    """Storage key for an instance snapshot, scoped to the Omni server it came from.
+
+    Multi-tenant hubs run one client per user; two tenants may both name an
+    instance "genie" on different servers.
+    """
+    return f"{client.base_url}#{instance}"
+
+
+class WhatsAppCache:
+    """SQLite-backed snapshot of contacts and groups, keyed by snapshot_key()."""
+
+    def __init__(self, db_path: str, ttl_seconds: int):
+        self.db_path = os.path.expanduser(db_path)
+        self.ttl_seconds = ttl_seconds
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._create_private_file()
+        with self._connect() as db:
+            db.executescript(_SCHEMA)
+
+    def _create_private_file(self) -> None:
+        """Create the database file readable by the current user only."""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.close(os.open(self.db_path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(self.db_path, 0o600)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits (or rolls back) and is closed on exit."""
+        db = sqlite3.connect(self.db_path)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def fetched_at(self, key: str) -> Optional[float]:
+        """Return when the snapshot was last refreshed, or None."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT fetched_at FROM wa_snapshots WHERE instance = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_contacts(self, key: str) -> List[Tuple[str, str]]:
+        """Return cached (phone, name) pairs for the snapshot."""
+        with self._connect() as db:
+            return db.execute(
+                "SELECT phone, name FROM wa_contacts WHERE instance = ?", (key,)
+            ).fetchall()
+
+    def load_groups(self, key: str) -> List[Tuple[str, str, List[str]]]:
+        """Return cached (group_id, name, member_phones) for the snapshot."""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT id, name, members_json FROM wa_groups WHERE instance = ?",
+                (key,),
+            ).fetchall()
+        return [
+            (group_id, name, json.loads(members)) for group_id, name, members in rows
+        ]
+
+    async def load_snapshot(
+        self, key: str
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str, List[str]]]]:
+        """Return (contacts, groups) for the snapshot, read off the event loop."""
+
+        def load():
+            return self.load_contacts(key), self.load_groups(key)
+
+        return await asyncio.to_thread(load)
+
+    def store_snapshot(
+        self,
+        key: str,
+        contacts: List[Tuple[str, str]],
+        groups: List[Tuple[str, str, List[str]]],
+    ) -> None:
+        """Replace the snapshot with freshly fetched rows."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("DELETE FROM wa_contacts WHERE instance = ?", (key,))
+            db.execute("DELETE FROM wa_groups WHERE instance = ?", (key,))
+            db.executemany(
+                "INSERT OR REPLACE INTO wa_contacts (phone, name, instance, fetched_at) VALUES (?, ?, ?, ?)",
+                [(phone, name, key, now) for phone, name in contacts],
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO wa_groups (id, name, members_json, instance, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (group_id, name, json.dumps(members), key, now)
+                    for group_id, name, members in groups
+                ],
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO wa_snapshots (instance, fetched_at) VALUES (?, ?)",
+                (key, now),
+            )
+
+    async def refresh(self, client: Any, instance: str) -> None:
+        """Fetch all contacts (paginated) and groups and store them."""
+        key = snapshot_key(client, instance)
+        contacts: List[Tuple[str, str]] = []
+        page = 1
+        while True:
+            response = await client.list_contacts(
+                instance_name=instance, page=page, page_size=CONTACTS_PAGE_SIZE
+            )
+            for contact in response.contacts:
+                if contact.id.endswith("@g.us"):
+                    continue
+                contacts.append(
+                    (contact.id.replace("@s.whatsapp.net", ""), contact.name)
+                )
+            if not response.has_more or not response.contacts:
+                break
+            page += 1
+
+        groups_response = await client.evolution_fetch_all_groups(
+            instance_name=instance, get_participants=True
+        )
+        raw_groups = (
+            groups_response
+            if isinstance(groups_response, list)
+            else groups_response.get("groups", [])
+        )
+
+        groups: List[Tuple[str, str, List[str]]] = []
+        for group in raw_groups:
+            group_id = group.get("id") or group.get("remoteJid") or ""
+            group_name = group.get("subject") or group.get("name") or ""
+            participants = group.get("participants", [])
+            members = []
+            if isinstance(participants, list):
+                for participant in participants:
+                    phone = participant.get("id", "").replace("@s.whatsapp.net", "")
+                    if phone:
+                        members.append(phone)
+            groups.append((group_id, group_name, members))
+
+        await asyncio.to_thread(self.store_snapshot, key, contacts, groups)
+        logger.info(
+            f"Refreshed WhatsApp cache for {instance}: {len(contacts)} contacts, {len(groups)} groups"
+        )
+
+    async def _background_refresh(self, client: Any, instance: str, key: str) -> None:
+        try:
+            await self.refresh(client, instance)
+        except Exception as e:
+            logger.warning(
+                f"Background WhatsApp cache refresh failed for {instance}: {e}"
+            )
+        finally:
+            self._refreshing.discard(key)
+
+    async def ensure_fresh(self, client: Any, instance: str) -> None:
+        """Make sure a snapshot exists; refresh stale ones in the background.
+
+        The first call for an instance blocks on a full fetch. Afterwards a
+        stale snapshot is served as-is while a single refresh task runs.
+        """
+        key = snapshot_key(client, instance)
+        fetched_at = await asyncio.to_thread(self.fetched_at, key)
+        if fetched_at is None:
+            await self.refresh(client, instance)
+            return
+
+        if time.time() - fetched_at < self.ttl_seconds or key in self._refreshing:
+            return
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._background_refresh(client, instance, key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+_caches: Dict[str, WhatsAppCache] = {}
+
+
+async def get_cache(db_path: str, ttl_seconds: int) -> WhatsAppCache:
+    """Return the shared cache for a database path (created on first use)."""
+    cache = _caches.get(db_path)
+    if cache is None:
+        cache = await asyncio.to_thread(WhatsAppCache, db_path, ttl_seconds)
+        cache = _caches.setdefault(db_path, cache)
+    return cache
@@ -1,8 +1,12 @@
 """HTTP client for OMNI API"""
 
+import asyncio
 import httpx
+import json
 import logging
-from typing import Optional, Dict, Any, List
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Dict, Any, List
 from .config import OmniConfig
 from .models import (
     InstanceConfig,
@@ -31,6 +35,14 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Media bodies whose base64 payload exceeds this are JSON-encoded in a worker thread
+LARGE_BODY_THRESHOLD = 1024 * 1024
+
+
+def _encode_json_body(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request body the same way httpx does for json=."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 def normalize_jid(phone_or_jid: str) -> str:
     """
@@ -59,6 +71,32 @@ def normalize_jid(phone_or_jid: str) -> str:
     return f"{phone_or_jid}@s.whatsapp.net"
 
 
+# Pooled keep-alive clients shared by all OmniClient instances, per event loop and timeout
+_shared_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def _get_shared_client(timeout: float) -> httpx.AsyncClient:
+    """Return the running loop's pooled client for this timeout, creating it if needed."""
+    clients = _shared_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(timeout)
+    if client is None or client.is_closed:
+        if client is not None:
+            await client.aclose()
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60),
+        )
+        clients[timeout] = client
+    return client
+
+
+async def close_shared_clients() -> None:
+    """Close the pooled HTTP clients of the running event loop."""
+    clients = _shared_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
 class OmniClient:
     """Async HTTP client for OMNI API"""
 
@@ -68,17 +106,33 @@ class OmniClient:
         self.headers = {"x-api-key": config.api_key, "Content-Type": "application/json"}
         self.timeout = httpx.Timeout(config.timeout)
 
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Yield the shared keep-alive HTTP client (not closed on exit).
+
+        The pooled client is shared by every OmniClient on the running event
+        loop, so per-request clients (multi-tenant mode) reuse TCP/TLS
+        connections instead of each owning a pool. close_shared_clients()
+        releases it on server shutdown.
+        """
+        yield await _get_shared_client(self.config.timeout)
+
+    def http_session(self):
+        """Shared keep-alive HTTP client for requests to other hosts (e.g. ElevenLabs in talk)."""
+        return self._session()
+
     async def _request(
         self,
         method: str,
         endpoint: str,
         json: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
+        content: Optional[bytes] = None,
     ) -> Dict[str, Any]:
-        """Make HTTP request with error handling"""
+        """Make HTTP request with error handling (content= sends a pre-encoded JSON body)"""
         url = f"{self.base_url}{endpoint}"
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.request(
                     method=method,
@@ -86,6 +140,7 @@ class OmniClient:
                     headers=self.headers,
                     json=json,
                     params=params,
+                    content=content,
                 )
                 response.raise_for_status()
 
@@ -169,6 +224,16 @@ class OmniClient:
         """Logout instance"""
         return await self._request("POST", f"/api/v1/instances/{instance_name}/logout")
 
+    async def _post_media(
+        self, endpoint: str, payload: Dict[str, Any], data_field: str
+    ) -> Dict[str, Any]:
+        """POST a media body, encoding multi-MB base64 payloads off the event loop"""
+        data = payload.get(data_field)
+        if data and len(data) > LARGE_BODY_THRESHOLD:
+            body = await asyncio.to_thread(_encode_json_body, payload)
+            return await self._request("POST", endpoint, content=body)
+        return await self._request("POST", endpoint, json=payload)
+
     # Message Operations
     async def send_text(
         self, instance_name: str, request: SendTextRequest
@@ -185,10 +250,10 @@ class OmniClient:
         self, instance_name: str, request: SendMediaRequest
     ) -> MessageResponse:
         """Send media message"""
-        data = await self._request(
-            "POST",
+        data = await self._post_media(
             f"/api/v1/instance/{instance_name}/send-media",
-            json=request.model_dump(exclude_none=True, by_alias=True),
+            request.model_dump(exclude_none=True, by_alias=True),
+            "media_base64",
         )
         return MessageResponse(**data)
 
@@ -196,10 +261,10 @@ class OmniClient:
         self, instance_name: str, request: SendAudioRequest
     ) -> MessageResponse:
         """Send audio message"""
-        data = await self._request(
-            "POST",
+        data = await self._post_media(
             f"/api/v1/instance/{instance_name}/send-audio",
-            json=request.model_dump(exclude_none=True),
+            request.model_dump(exclude_none=True),
+            "audio_base64",
         )
         return MessageResponse(**data)
 
@@ -409,7 +474,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 payload: Dict[str, Any] = {
                     "number": remote_jid,
@@ -468,7 +533,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/message/sendReaction/{instance_name}",
@@ -507,7 +572,7 @@ class OmniClient:
             raise Exception("Evolution API not configured for this instance")
 
         # Call Evolution API directly
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/chat/findMessages/{instance_name}",
@@ -518,6 +583,9 @@ class OmniClient:
                     json={
                         "where": {"key": {"remoteJid": remote_jid}},
                         "limit": limit,
+                        # Evolution v2 pages by offset (page size) + page and ignores limit
+                        "offset": limit,
+                        "page": 1,
                         "sort": {"messageTimestamp": -1}  # Newest first
                     }
                 )
@@ -554,7 +622,7 @@ class OmniClient:
         if address:
             payload["address"] = address
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/message/sendLocation/{instance_name}",
@@ -583,7 +651,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.request(
                     method="DELETE",
@@ -622,7 +690,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/chat/sendPresence/{instance_name}",
@@ -658,7 +726,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/chat/updateMessage/{instance_name}",
@@ -694,7 +762,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/chat/whatsappNumbers/{instance_name}",
@@ -725,7 +793,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/message/sendPoll/{instance_name}",
@@ -760,7 +828,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 payload: Dict[str, Any] = {
                     "number": remote_jid,
@@ -809,7 +877,7 @@ class OmniClient:
         if not media_url and not media_base64:
             raise Exception("Either media_url or media_base64 must be provided")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 payload: Dict[str, Any] = {
                     "number": remote_jid,
@@ -859,6 +927,51 @@ class OmniClient:
                 logger.error(f"Evolution API request failed: {str(e)}")
                 raise
 
+    async def evolution_send_media_file(
+        self, instance_name: str, remote_jid: str, file_name: str, file_data: bytes,
+        media_type: str = "image", caption: Optional[str] = None,
+        mime_type: Optional[str] = None, delay: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Send a local media file via Evolution API as multipart/form-data
+
+        Uploads the raw bytes instead of a base64 JSON body (requires an
+        Evolution API build with sendMedia file upload support).
+        """
+        remote_jid = normalize_jid(remote_jid)
+        instance = await self.get_instance(instance_name, include_status=False)
+
+        if not instance.evolution_url or not instance.evolution_key:
+            raise Exception("Evolution API not configured for this instance")
+
+        async with self._session() as client:
+            try:
+                form: Dict[str, str] = {
+                    "number": remote_jid,
+                    "mediatype": media_type,
+                    "fileName": file_name,
+                }
+                if caption:
+                    form["caption"] = caption
+                if mime_type:
+                    form["mimetype"] = mime_type
+                if delay:
+                    form["delay"] = str(delay)
+
+                response = await client.post(
+                    f"{instance.evolution_url}/message/sendMedia/{instance_name}",
+                    headers={"apikey": instance.evolution_key},
+                    data=form,
+                    files={"file": (file_name, file_data, mime_type or "application/octet-stream")},
+                )
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPStatusError as e:
+                logger.error(f"Evolution API error {e.response.status_code}: {e.response.text}")
+                raise Exception(f"Evolution API error: {e.response.status_code} - {e.response.text}")
+            except Exception as e:
+                logger.error(f"Evolution API request failed: {str(e)}")
+                raise
+
     async def evolution_send_contact(
         self, instance_name: str, remote_jid: str, contacts: List[Dict[str, Any]],
         quoted_message_id: Optional[str] = None, delay: Optional[int] = None
@@ -870,7 +983,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 # Convert contact fields from snake_case to camelCase for Evolution API
                 evolution_contacts = []
@@ -924,7 +1037,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.post(
                     f"{instance.evolution_url}/chat/findChats/{instance_name}",
@@ -952,7 +1065,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.get(
                     f"{instance.evolution_url}/group/fetchAllGroups/{instance_name}",
@@ -979,7 +1092,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 response = await client.get(
                     f"{instance.evolution_url}/group/participants/{instance_name}",
@@ -1010,7 +1123,7 @@ class OmniClient:
         if not instance.evolution_url or not instance.evolution_key:
             raise Exception("Evolution API not configured for this instance")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._session() as client:
             try:
                 payload = {
                     "message": {
@@ -1,8 +1,33 @@
 """Configuration for OMNI MCP tool"""
 
+from collections import OrderedDict
+from pathlib import Path
 from pydantic_settings import BaseSettings
-from pydantic import Field
-from typing import Optional, Literal
+from pydantic import Field, PrivateAttr
+from typing import Optional, Literal, Tuple
+
+# Logged by every send tool when no master context is configured
+FULL_ACCESS_WARNING = (
+    "⚠️ WARNING: FULL WhatsApp ACCESS MODE\n"
+    "No master context defined. Agent can send messages to ANYONE.\n"
+    "This is DANGEROUS. Configure master_phone or master_group for safety.\n"
+    "Set via: OMNI_MASTER_PHONE=5511999999999 or OMNI_MASTER_GROUP=120363xxx@g.us"
+)
+
+
+
+# Most recipients whose validate_recipient result is kept per config
+_RECIPIENT_CACHE_SIZE = 1024
+
+
+def _default_cache_db_path() -> str:
+    """Per-user location for the contact/group cache (it holds private member lists)."""
+    try:
+        base_dir = Path.home()
+    except RuntimeError:
+        # Home directory can be unavailable in some sandboxed environments
+        base_dir = Path.cwd()
+    return str(base_dir / ".genie-omni" / "whatsapp-cache.db")
 
 
 class OmniConfig(BaseSettings):
@@ -59,6 +84,53 @@ class OmniConfig(BaseSettings):
         alias="OMNI_MEDIA_DOWNLOAD_FOLDER",
     )
 
+    cache_db_path: str = Field(
+        default_factory=_default_cache_db_path,
+        description="SQLite file holding the per-instance WhatsApp contact/group cache used by search (created with 0600 permissions)",
+        alias="OMNI_CACHE_DB_PATH",
+    )
+
+    cache_ttl: int = Field(
+        default=600,
+        description="Seconds before the contact/group cache is refreshed in the background",
+        alias="OMNI_CACHE_TTL",
+    )
+
+    broadcast_rate_limit: float = Field(
+        default=10.0,
+        description="Maximum messages per second sent by broadcast_whatsapp (per instance)",
+        alias="OMNI_BROADCAST_RATE_LIMIT",
+    )
+
+    broadcast_concurrency: int = Field(
+        default=5,
+        description="Maximum in-flight sends for broadcast_whatsapp",
+        alias="OMNI_BROADCAST_CONCURRENCY",
+    )
+
+    save_voice_messages: bool = Field(
+        default=False,
+        description="Also keep talk() voice notes that were delivered (failed sends are always saved under <media_download_folder>/voice-messages)",
+        alias="OMNI_SAVE_VOICE_MESSAGES",
+    )
+
+    presence_delay: int = Field(
+        default=0,
+        description="Milliseconds the typing/recording indicator is held before send_whatsapp messages (0 = no hold)",
+        alias="OMNI_PRESENCE_DELAY",
+    )
+
+    evolution_multipart_upload: bool = Field(
+        default=False,
+        description="Upload large local media files and talk() voice notes to Evolution as multipart/form-data instead of base64 JSON (needs Evolution API file upload support)",
+        alias="OMNI_EVOLUTION_MULTIPART_UPLOAD",
+    )
+
+    # validate_recipient results per recipient (LRU); cleared whenever a field is reassigned
+    _recipient_cache: "OrderedDict[str, Tuple[bool, str]]" = PrivateAttr(
+        default_factory=OrderedDict
+    )
+
     model_config = {
         "env_prefix": "OMNI_",
         "env_file": ".env",
@@ -67,6 +139,17 @@ class OmniConfig(BaseSettings):
         "extra": "ignore",
     }
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._recipient_cache.clear()
+
+    def __copy__(self):
+        # model_copy(update=...) writes fields without __setattr__; never share the cache
+        copied = super().__copy__()
+        copied._recipient_cache = OrderedDict()
+        return copied
+
     def validate_for_use(self):
         """Validate configuration is ready for use"""
         if not self.api_key:
@@ -92,12 +175,7 @@ class OmniConfig(BaseSettings):
             master = "phone " + self.master_phone if self.master_phone else "group " + self.master_group
             return f"✅ SAFE MODE: Context isolated to {master}"
         else:
-            return (
-                "⚠️ WARNING: FULL WhatsApp ACCESS MODE\n"
-                "No master context defined. Agent can send messages to ANYONE.\n"
-                "This is DANGEROUS. Configure master_phone or master_group for safety.\n"
-                "Set via: OMNI_MASTER_PHONE=5511999999999 or OMNI_MASTER_GROUP=120363xxx@g.us"
-            )
+            return FULL_ACCESS_WARNING
 
     def validate_recipient(self, recipient: str) -> tuple[bool, str]:
         """
@@ -109,6 +187,18 @@ class OmniConfig(BaseSettings):
         Returns:
             Tuple of (is_allowed, message)
         """
+        cached = self._recipient_cache.get(recipient)
+        if cached is not None:
+            self._recipient_cache.move_to_end(recipient)
+            return cached
+
+        cached = self._recipient_cache[recipient] = self._check_recipient(recipient)
+        while len(self._recipient_cache) > _RECIPIENT_CACHE_SIZE:
+            self._recipient_cache.popitem(last=False)
+        return cached
+
+    def _check_recipient(self, recipient: str) -> tuple[bool, str]:
+        """Uncached recipient check behind validate_recipient."""
         if not self.has_master_context():
             # No master context = full access mode (dangerous)
             return True, self.get_safety_warning()
@@ -7,15 +7,26 @@ You ARE connected to WhatsApp. You CAN send and read messages.
 """
 
 import logging
+from contextlib import asynccontextmanager
 from typing import Optional
 from fastmcp import FastMCP, Context
-from .client import OmniClient
+from .client import OmniClient, close_shared_clients
 from .config import OmniConfig
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Close the pooled HTTP clients (Omni, Evolution, ElevenLabs) on shutdown."""
+    try:
+        yield
+    finally:
+        await close_shared_clients()
+
+
 # Initialize MCP server
-mcp = FastMCP("genie-omni")
+mcp = FastMCP("genie-omni", lifespan=lifespan)
 
 # Global client and config (initialized on first use)
 _client: Optional[OmniClient] = None
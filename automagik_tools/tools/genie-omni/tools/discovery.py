@@ -1,33 +1,56 @@
 """Discovery tools - Find and download information."""
 
+import heapq
+import io
 import logging
 import sqlite3
 import os
 import unicodedata
+from collections import namedtuple
 from typing import Callable, Optional
 from pathlib import Path
 import base64
 from fastmcp import FastMCP, Context
-from thefuzz import fuzz
+from rapidfuzz import fuzz
+from ..cache import get_cache, snapshot_key
 
 logger = logging.getLogger(__name__)
 
+MAX_PAYLOADS_SHOWN = 50  # find_message payload listing cap
+
+# Lightweight per-row match records for find_person / search
+Match = namedtuple("Match", "name source original_name score")
+GroupMatch = namedtuple("GroupMatch", "name members score")
+
 def _get_db_path() -> str:
     """Get the SQLite database path from environment."""
     db_path = os.getenv("AUTOMAGIK_OMNI_SQLITE_DATABASE_PATH", "/home/namastex/data/automagik-omni.db")
     return db_path
 
+# Combining diacritical marks (U+0300-U+036F): covers the accents NFD splits off Latin letters
+_STRIP_LATIN_ACCENTS = dict.fromkeys(range(0x0300, 0x0370))
+
+
 def _normalize_search(text: str) -> str:
     """Normalize search text: lowercase, remove accents, strip spaces."""
     if not text:
         return ""
     # Remove accents
-    text = unicodedata.normalize('NFD', text)
-    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    text = unicodedata.normalize('NFD', text).translate(_STRIP_LATIN_ACCENTS)
+    if not text.isascii():
+        # Rare: combining marks outside the Latin block
+        text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
     # Lowercase and strip
     return text.lower().strip()
 
 
+def _fuzzy_score(query: str, candidate: str, cutoff: int) -> int:
+    """Partial-ratio score rounded to an int; 0 when below cutoff (lets rapidfuzz prune early)."""
+    if not candidate:
+        return 0
+    return int(round(fuzz.partial_ratio(query, candidate, score_cutoff=cutoff)))
+
+
 def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
     """Register discovery tools with the MCP server."""
     @mcp.tool()
@@ -36,10 +59,6 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 ,
         ctx: Optional[Context] = None,) -> str:
         """Download media from WhatsApp message (image/video/audio/document). Args: message_id, instance_name, filename (optional, auto-detected). Returns: local file path where saved."""
-        import base64
-        import os
-        from pathlib import Path
-
         config = get_config(ctx)
         client = get_client(ctx)
 
@@ -136,13 +155,16 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 result.append(f"Error: {trace.error_message}")
 
             if include_payload:
-                payloads = await client.get_trace_payloads(trace_id, include_payload=True)
+                # Only stage/type/time are shown, so skip downloading the payload bodies
+                payloads = await client.get_trace_payloads(trace_id, include_payload=False)
                 result.append("")
                 result.append(f"PAYLOADS ({len(payloads)} total):")
-                for payload in payloads:
+                for payload in payloads[:MAX_PAYLOADS_SHOWN]:
                     result.append(f"  Stage: {payload.stage}")
                     result.append(f"  Type: {payload.payload_type}")
                     result.append(f"  Time: {payload.timestamp}")
+                if len(payloads) > MAX_PAYLOADS_SHOWN:
+                    result.append(f"  ... and {len(payloads) - MAX_PAYLOADS_SHOWN} more")
 
             return "\n".join(result)
 
@@ -155,7 +177,7 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
     async def find_person(search: str, instance_name: str = "genie",
         ctx: Optional[Context] = None,) -> str:
         """Find person by name with fuzzy search (handles typos, accents, case). Searches local DB + WhatsApp. Args: search (name), instance_name. Returns: matching contacts sorted by relevance."""
-        all_contacts = {}  # phone_number -> {name, source, original_name, score}
+        all_contacts = {}  # phone_number -> Match
         normalized_search = _normalize_search(search)
         MIN_SCORE = 60  # Minimum fuzzy match score (0-100)
 
@@ -171,20 +193,15 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 norm_nickname = _normalize_search(nickname) if nickname else ""
 
                 # Calculate fuzzy scores
-                name_score = fuzz.partial_ratio(normalized_search, norm_name)
-                nickname_score = fuzz.partial_ratio(normalized_search, norm_nickname) if norm_nickname else 0
+                name_score = _fuzzy_score(normalized_search, norm_name, MIN_SCORE)
+                nickname_score = _fuzzy_score(normalized_search, norm_nickname, MIN_SCORE) if norm_nickname else 0
 
                 # Use best score
                 best_score = max(name_score, nickname_score)
 
                 if best_score >= MIN_SCORE:
                     display_name = f"{name}" + (f" ({nickname})" if nickname else "")
-                    all_contacts[phone] = {
-                        "name": display_name,
-                        "source": "local",
-                        "original_name": name,
-                        "score": best_score
-                    }
+                    all_contacts[phone] = Match(display_name, "local", name, best_score)
 
             db.close()
         except Exception as e:
@@ -207,17 +224,12 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
                     # Normalize and score
                     norm_contact_name = _normalize_search(contact.name)
-                    score = fuzz.partial_ratio(normalized_search, norm_contact_name)
+                    score = _fuzzy_score(normalized_search, norm_contact_name, MIN_SCORE)
 
                     if score >= MIN_SCORE:
                         # Only add if not already in local contacts (local takes priority)
                         if phone not in all_contacts:
-                            all_contacts[phone] = {
-                                "name": contact.name,
-                                "source": "whatsapp",
-                                "original_name": contact.name,
-                                "score": score
-                            }
+                            all_contacts[phone] = Match(contact.name, "whatsapp", contact.name, score)
 
         except Exception as e:
             logger.warning(f"Failed to search Evolution contacts: {e}")
@@ -232,13 +244,13 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
         # Sort by score (highest first), then by name
         sorted_contacts = sorted(
             all_contacts.items(),
-            key=lambda x: (-x[1]["score"], x[1]["original_name"].lower())
+            key=lambda x: (-x[1].score, x[1].original_name.lower())
         )
 
         for phone, data in sorted_contacts:
-            source_icon = "💾" if data["source"] == "local" else "📱"
-            score_display = f"{data['score']}%" if data["score"] < 100 else ""
-            result.append(f"{source_icon} {data['name']} {score_display}".strip())
+            source_icon = "💾" if data.source == "local" else "📱"
+            score_display = f"{data.score}%" if data.score < 100 else ""
+            result.append(f"{source_icon} {data.name} {score_display}".strip())
             result.append(f"   📞 {phone}")
             result.append("")
 
@@ -253,8 +265,8 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
         normalized_query = _normalize_search(query)
 
         # Results containers
-        people_results = {}  # phone -> {name, source, score}
-        group_results = {}   # group_id -> {name, members, score}
+        people_results = {}  # phone -> Match
+        group_results = {}   # group_id -> GroupMatch
         message_results = [] # [{sender, text, time, mention}]
 
         client = get_client(ctx)
@@ -270,105 +282,89 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 norm_name = _normalize_search(name)
                 norm_nickname = _normalize_search(nickname) if nickname else ""
 
-                name_score = fuzz.partial_ratio(normalized_query, norm_name)
-                nickname_score = fuzz.partial_ratio(normalized_query, norm_nickname) if norm_nickname else 0
+                name_score = _fuzzy_score(normalized_query, norm_name, MIN_SCORE)
+                nickname_score = _fuzzy_score(normalized_query, norm_nickname, MIN_SCORE) if norm_nickname else 0
                 best_score = max(name_score, nickname_score)
 
                 if best_score >= MIN_SCORE:
                     display_name = f"{name}" + (f" ({nickname})" if nickname else "")
-                    people_results[phone] = {"name": display_name, "source": "local", "score": best_score}
+                    people_results[phone] = Match(display_name, "local", name, best_score)
 
             db.close()
         except Exception as e:
             logger.warning(f"Local search failed: {e}")
 
+        # WhatsApp contacts and groups come from the local per-instance snapshot
+        config = get_config(ctx)
         try:
-            # WhatsApp contacts
-            contacts = await client.list_contacts(
-                instance_name=instance_name, page=1, page_size=20, search_query=query
+            cache = await get_cache(config.cache_db_path, config.cache_ttl)
+            await cache.ensure_fresh(client, instance_name)
+            cached_contacts, cached_groups = await cache.load_snapshot(
+                snapshot_key(client, instance_name)
             )
+        except Exception as e:
+            logger.warning(f"WhatsApp cache unavailable: {e}")
+            cached_contacts, cached_groups = [], []
 
-            if contacts.contacts:
-                for contact in contacts.contacts:
-                    if contact.id.endswith("@g.us"):
-                        continue
-
-                    phone = contact.id.replace("@s.whatsapp.net", "")
-                    norm_name = _normalize_search(contact.name)
-                    score = fuzz.partial_ratio(normalized_query, norm_name)
+        for phone, name in cached_contacts:
+            if phone in people_results:
+                continue
+            norm_name = _normalize_search(name)
+            score = _fuzzy_score(normalized_query, norm_name, MIN_SCORE)
 
-                    if score >= MIN_SCORE and phone not in people_results:
-                        people_results[phone] = {"name": contact.name, "source": "whatsapp", "score": score}
-        except Exception as e:
-            logger.warning(f"WhatsApp contacts search failed: {e}")
+            if score >= MIN_SCORE:
+                people_results[phone] = Match(name, "whatsapp", name, score)
 
         # 2. Search Groups
-        try:
-            groups_response = await client.evolution_fetch_all_groups(
-                instance_name=instance_name, get_participants=True
-            )
-            groups = groups_response if isinstance(groups_response, list) else groups_response.get("groups", [])
+        # Participant IDs are pure digit strings, so only phone-number queries can match them
+        phone_query = normalized_query.removeprefix("+")
+        if not phone_query.isdigit():
+            phone_query = ""
 
-            for group in groups:
-                group_name = group.get("subject") or group.get("name") or ""
-                group_id = group.get("id") or group.get("remoteJid") or ""
-                participants = group.get("participants", [])
+        for group_id, group_name, members in cached_groups:
+            norm_group_name = _normalize_search(group_name)
+            score = _fuzzy_score(normalized_query, norm_group_name, MIN_SCORE)
 
-                norm_group_name = _normalize_search(group_name)
-                score = fuzz.partial_ratio(normalized_query, norm_group_name)
-
-                if score >= MIN_SCORE:
-                    member_count = len(participants) if isinstance(participants, list) else 0
-                    group_results[group_id] = {"name": group_name, "members": member_count, "score": score}
-
-                # Search group members
-                if isinstance(participants, list):
-                    for participant in participants:
-                        participant_id = participant.get("id", "")
-                        participant_phone = participant_id.replace("@s.whatsapp.net", "")
-
-                        if participant_phone and participant_phone not in people_results:
-                            # Try to match participant ID with query
-                            score = fuzz.partial_ratio(normalized_query, participant_phone)
-                            if score >= MIN_SCORE:
-                                people_results[participant_phone] = {
-                                    "name": f"Member of {group_name}",
-                                    "source": "group",
-                                    "score": score
-                                }
-        except Exception as e:
-            logger.warning(f"Group search failed: {e}")
+            if score >= MIN_SCORE:
+                group_results[group_id] = GroupMatch(group_name, len(members), score)
+
+            # Search group members (cheap substring match, no fuzzy scoring on digits)
+            if phone_query:
+                for participant_phone in members:
+                    if participant_phone not in people_results and phone_query in participant_phone:
+                        people_results[participant_phone] = Match(f"Member of {group_name}", "group", group_name, 100)
 
         # 3. Format Results
         if not people_results and not group_results and not message_results:
             return f"🔍 No results for '{query}'"
 
-        result = [f"🔍 SEARCH: '{query}'", ""]
+        buf = io.StringIO()
+        buf.write(f"🔍 SEARCH: '{query}'\n\n")
 
         # People
         if people_results:
-            result.append(f"👤 PEOPLE ({len(people_results)})")
-            sorted_people = sorted(people_results.items(), key=lambda x: (-x[1]["score"], x[1]["name"].lower()))
-            for phone, data in sorted_people[:10]:
-                icon = "💾" if data["source"] == "local" else "📱" if data["source"] == "whatsapp" else "👥"
-                score_str = f" {data['score']}%" if data["score"] < 100 else ""
-                result.append(f"{icon} {data['name']} - {phone}{score_str}")
-            if len(sorted_people) > 10:
-                result.append(f"... and {len(sorted_people) - 10} more")
-            result.append("")
+            buf.write(f"👤 PEOPLE ({len(people_results)})\n")
+            top_people = heapq.nsmallest(10, people_results.items(), key=lambda x: (-x[1].score, x[1].name.lower()))
+            for phone, data in top_people:
+                icon = "💾" if data.source == "local" else "📱" if data.source == "whatsapp" else "👥"
+                score_str = f" {data.score}%" if data.score < 100 else ""
+                buf.write(f"{icon} {data.name} - {phone}{score_str}\n")
+            if len(people_results) > 10:
+                buf.write(f"... and {len(people_results) - 10} more\n")
+            buf.write("\n")
 
         # Groups
         if group_results:
-            result.append(f"👥 GROUPS ({len(group_results)})")
-            sorted_groups = sorted(group_results.items(), key=lambda x: (-x[1]["score"], x[1]["name"].lower()))
-            for group_id, data in sorted_groups[:10]:
-                score_str = f" {data['score']}%" if data["score"] < 100 else ""
-                result.append(f"📱 {data['name']} - {group_id} ({data['members']} members){score_str}")
-            if len(sorted_groups) > 10:
-                result.append(f"... and {len(sorted_groups) - 10} more")
-            result.append("")
+            buf.write(f"👥 GROUPS ({len(group_results)})\n")
+            top_groups = heapq.nsmallest(10, group_results.items(), key=lambda x: (-x[1].score, x[1].name.lower()))
+            for group_id, data in top_groups:
+                score_str = f" {data.score}%" if data.score < 100 else ""
+                buf.write(f"📱 {data.name} - {group_id} ({data.members} members){score_str}\n")
+            if len(group_results) > 10:
+                buf.write(f"... and {len(group_results) - 10} more\n")
+            buf.write("\n")
 
-        return "\n".join(result)
+        return buf.getvalue().rstrip("\n")
 
 
     @mcp.tool()
@@ -386,8 +382,8 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             if not chats:
                 return "💬 No chats found"
 
-            result = [f"💬 ALL CHATS ({len(chats)} total)"]
-            result.append("")
+            buf = io.StringIO()
+            buf.write(f"💬 ALL CHATS ({len(chats)} total)\n\n")
 
             for chat in chats[:50]:  # Limit to first 50 for readability
                 # Extract chat info from various possible structures
@@ -397,16 +393,15 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 is_group = "@g.us" in str(chat_id)
 
                 icon = "👥" if is_group else "👤"
-                result.append(f"{icon} {chat_name}")
-                result.append(f"  ID: {chat_id}")
+                buf.write(f"{icon} {chat_name}\n  ID: {chat_id}\n")
                 if unread and unread > 0:
-                    result.append(f"  Unread: {unread}")
-                result.append("")
+                    buf.write(f"  Unread: {unread}\n")
+                buf.write("\n")
 
             if len(chats) > 50:
-                result.append(f"... and {len(chats) - 50} more chats")
+                buf.write(f"... and {len(chats) - 50} more chats\n")
 
-            return "\n".join(result)
+            return buf.getvalue().rstrip("\n")
 
         except Exception as e:
             logger.error(f"Error finding chats: {e}")
@@ -430,8 +425,8 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             if not groups:
                 return "👥 No groups found"
 
-            result = [f"👥 ALL GROUPS ({len(groups)} total)"]
-            result.append("")
+            buf = io.StringIO()
+            buf.write(f"👥 ALL GROUPS ({len(groups)} total)\n\n")
 
             for group in groups:
                 # Extract group info
@@ -440,18 +435,16 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 participants = group.get("participants", [])
                 participant_count = len(participants) if isinstance(participants, list) else group.get("size", 0)
 
-                result.append(f"👥 {group_name}")
-                result.append(f"  ID: {group_id}")
-                result.append(f"  Members: {participant_count}")
+                buf.write(f"👥 {group_name}\n  ID: {group_id}\n  Members: {participant_count}\n")
 
                 # Show creator if available
                 owner = group.get("owner") or group.get("creator")
                 if owner:
-                    result.append(f"  Creator: {owner}")
+                    buf.write(f"  Creator: {owner}\n")
 
-                result.append("")
+                buf.write("\n")
 
-            return "\n".join(result)
+            return buf.getvalue().rstrip("\n")
 
         except Exception as e:
             logger.error(f"Error listing groups: {e}")
@@ -475,9 +468,8 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             if not participants:
                 return f"👥 No members found in group {group_jid}"
 
-            result = [f"👥 GROUP MEMBERS ({len(participants)} total)"]
-            result.append(f"Group: {group_jid}")
-            result.append("")
+            buf = io.StringIO()
+            buf.write(f"👥 GROUP MEMBERS ({len(participants)} total)\nGroup: {group_jid}\n\n")
 
             for participant in participants:
                 # Extract participant info
@@ -501,15 +493,11 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
                 # Format output with real phone number
                 if name:
-                    result.append(f"{role} {name}")
-                    result.append(f"  LID: {lid}")
-                    result.append(f"  Phone: {phone}")
+                    buf.write(f"{role} {name}\n  LID: {lid}\n  Phone: {phone}\n\n")
                 else:
-                    result.append(f"{role} LID: {lid}")
-                    result.append(f"  Phone: {phone}")
-                result.append("")
+                    buf.write(f"{role} LID: {lid}\n  Phone: {phone}\n\n")
 
-            return "\n".join(result)
+            return buf.getvalue().rstrip("\n")
 
         except Exception as e:
             logger.error(f"Error getting group members: {e}")
@@ -1,22 +1,289 @@
 """Messaging tools - Send and manage WhatsApp messages."""
 
+import asyncio
+import functools
+import inspect
 import logging
+import mimetypes
+import os
+import re
+import sqlite3
+import stat
+import time
+import unicodedata
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Callable, Optional, Literal, Dict, List, Any
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlparse
 from fastmcp import FastMCP, Context
+from rapidfuzz import fuzz, process
+
+try:
+    # SIMD base64 encoder, used for media uploads when installed
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+from ..client import normalize_jid
+from ..config import FULL_ACCESS_WARNING
 from ..models import SendMediaRequest, SendAudioRequest
+from .multimodal import _instance_cache_key
+from .reading import evict_cached_messages
 
 logger = logging.getLogger(__name__)
 
+# Load the MIME tables at import instead of on the first media send
+mimetypes.init()
+
+# Read size for streaming base64 encoding: ~64KB and a multiple of 3 so no chunk is padded
+_B64_READ_CHUNK = 64 * 1024 - (64 * 1024) % 3
+
+
+@lru_cache(maxsize=256)
+def _guess_mime(suffix: str) -> Optional[str]:
+    """Guess a MIME type from a (lowercased) file extension, cached per extension."""
+    return mimetypes.guess_type("file" + suffix)[0]
+
+
+def _encode_file_base64(file_path: Path) -> str:
+    """Base64-encode a file chunk by chunk instead of holding the raw bytes and the encoding at once."""
+    encoded = bytearray()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(_B64_READ_CHUNK):
+            encoded += b64encode(chunk)
+    return encoded.decode("ascii")
+
+
+# Local media reads/encodes get their own small pool so concurrent uploads cannot
+# occupy every thread of the loop's default executor (used for DNS, stat, ...)
+_MEDIA_ENCODE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="genie-omni-media"
+)
+
+
+async def _encode_local_media(file_path: Path) -> str:
+    """Read and base64-encode a local media file on the media thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_MEDIA_ENCODE_EXECUTOR, _encode_file_base64, file_path)
+
+
+async def _read_local_media(file_path: Path) -> bytes:
+    """Read a local media file's raw bytes on the media thread pool (multipart uploads)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_MEDIA_ENCODE_EXECUTOR, file_path.read_bytes)
+
+
+# Local media at least this large is uploaded as multipart when OMNI_EVOLUTION_MULTIPART_UPLOAD is on
+_MULTIPART_MIN_BYTES = 5 * 1024 * 1024
+
+
+# media_url/audio_url values with these prefixes are never local files, so skip the stat()
+_REMOTE_PREFIXES = ("http://", "https://", "data:")
+
+
+def _local_file_size(file_path: Path) -> Optional[int]:
+    """Size of a local regular file in bytes, or None if there is none (one stat() call)."""
+    try:
+        st = file_path.stat()
+    except OSError:
+        return None
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
+# Phone numbers (optionally +, spaces, dashes, parentheses) or JIDs such as 5511...@s.whatsapp.net / 120363...@g.us
+_RECIPIENT_RE = re.compile(r"^\+?\(?\d[\d\s().\-]*(?:[@:][\w.:@\-]+)?$")
+_INVALID_RECIPIENT = "❌ Invalid recipient format: expected a phone number with country code or a WhatsApp JID"
+
+
+def _is_valid_recipient(recipient: Any) -> bool:
+    """Cheap format check run before the master-context validation."""
+    return isinstance(recipient, str) and _RECIPIENT_RE.match(recipient) is not None
+
+
+def _message_id(response: Any, default: str = "Unknown") -> str:
+    """Message ID from an Evolution API send response (response["key"]["id"])."""
+    try:
+        return response["key"]["id"]
+    except (KeyError, TypeError):
+        return default
+
+
+# Emoji shown in send_presence confirmations
+_PRESENCE_EMOJI = {
+    "composing": "⌨️",
+    "recording": "🎤",
+    "paused": "⏸️",
+    "available": "🟢",
+    "unavailable": "⚫"
+}
+
+# Strong references to in-flight presence tasks so they are not garbage collected mid-request
+_presence_tasks: set = set()
+
+
+async def _send_presence_quietly(client: Any, instance_name: str, to: str, presence: str, delay: int) -> None:
+    """Send a presence indicator, logging (not raising) failures."""
+    try:
+        await client.evolution_send_presence(
+            instance_name=instance_name,
+            remote_jid=to,
+            presence=presence,
+            delay=delay
+        )
+    except Exception as e:
+        logger.warning(f"Failed to send presence: {e}")
+
+
+async def _start_presence(client: Any, instance_name: str, to: str, presence: str, delay: int) -> None:
+    """Fire a presence indicator that runs concurrently with the message send."""
+    task = asyncio.create_task(_send_presence_quietly(client, instance_name, to, presence, delay))
+    _presence_tasks.add(task)
+    task.add_done_callback(_presence_tasks.discard)
+    # Yield once so the presence request is issued before the message request
+    await asyncio.sleep(0)
+
+
+# Combining diacritical marks (U+0300-U+036F): covers the accents NFD splits off Latin letters
+_STRIP_LATIN_ACCENTS = dict.fromkeys(range(0x0300, 0x0370))
+
+
+def _normalize_contact_name(text: str) -> str:
+    """Lowercase, strip accents and surrounding spaces for fuzzy contact matching."""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFD', text).translate(_STRIP_LATIN_ACCENTS)
+    if not text.isascii():
+        # Rare: combining marks outside the Latin block
+        text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    return text.lower().strip()
+
+
+# Saved contacts for send_contact(contact_name=...): db_path -> ((mtime_ns, size), SavedContacts)
+_saved_contacts_cache: Dict[str, tuple] = {}
+
+# Parallel lists: rows[i] is (phone, name); norm_names/norm_nicknames[i] are its match keys
+SavedContacts = namedtuple("SavedContacts", "rows norm_names norm_nicknames")
+
+
+def _load_saved_contacts(db_path: str) -> SavedContacts:
+    """Return the saved contacts with normalized match keys, re-read only when the db file changes."""
+    st = os.stat(db_path)
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _saved_contacts_cache.get(db_path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    db = sqlite3.connect(db_path)
+    try:
+        rows = db.execute("SELECT phone_number, name, nickname FROM contacts").fetchall()
+    finally:
+        db.close()
+
+    contacts = SavedContacts(
+        rows=[(phone, name) for phone, name, _ in rows],
+        norm_names=[_normalize_contact_name(name) for _, name, _ in rows],
+        norm_nicknames=[_normalize_contact_name(nickname) for _, _, nickname in rows],
+    )
+    _saved_contacts_cache[db_path] = (version, contacts)
+    return contacts
+
+
+# check_is_whatsapp results: (omni url, api key, instance, number) -> (label, exists, checked_at monotonic)
+_WA_STATUS_TTL = 3600
+_WA_STATUS_CACHE_SIZE = 4096
+_wa_status_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+# Upper bound on recipients for a single broadcast_whatsapp call
+MAX_BROADCAST_RECIPIENTS = 200
+
+
+class _RateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart (shared across concurrent callers)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# One limiter per (omni url, api key, instance, rate) so every broadcast on a WhatsApp number shares the same budget
+_broadcast_limiters: Dict[tuple, _RateLimiter] = {}
+
+
+def _get_broadcast_limiter(client: Any, instance_name: str, rate: float) -> _RateLimiter:
+    key = (*_instance_cache_key(client, instance_name), rate)
+    limiter = _broadcast_limiters.get(key)
+    if limiter is None:
+        limiter = _broadcast_limiters[key] = _RateLimiter(rate)
+    return limiter
+
 
 def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
     """Register messaging tools with the MCP server."""
+
+    def guarded_tool(recipient_arg: str = "to", action: str = "send"):
+        """Check the recipient against the master context before running a send tool.
+
+        Blocked recipients get the validation message back without the tool
+        running; in full access mode the safety warning is logged first.
+        Afterwards the recipient's cached message history is dropped so
+        read_messages shows what was just sent.
+        """
+
+        def decorator(func):
+            signature = inspect.signature(func)
+            default_instance = signature.parameters["instance_name"].default
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if args or recipient_arg not in kwargs:
+                    arguments = signature.bind_partial(*args, **kwargs).arguments
+                else:
+                    arguments = kwargs
+                recipient = arguments.get(recipient_arg)
+                if not _is_valid_recipient(recipient):
+                    return _INVALID_RECIPIENT
+
+                config = get_config(arguments.get("ctx"))
+                is_allowed, validation_message = config.validate_recipient(recipient)
+                if not is_allowed:
+                    logger.warning(f"Blocked {action} attempt to {recipient}: {validation_message}")
+                    return validation_message
+
+                if not config.has_master_context():
+                    logger.warning(FULL_ACCESS_WARNING)
+
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    evict_cached_messages(
+                        get_client(arguments.get("ctx")),
+                        arguments.get("instance_name", default_instance),
+                        recipient,
+                    )
+
+            return wrapper
+
+        return decorator
+
     # =============================================================================
     # CATEGORY 2: SEND (Active Communication)
     # =============================================================================
 
 
     @mcp.tool()
+    @guarded_tool(action="send")
     async def send_whatsapp(
         to: str,
         message: str,
@@ -32,18 +299,6 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         ctx: Optional[Context] = None,) -> str:
         """Send WhatsApp message (text/media/audio). Args: to (phone or contact ID), message (text or caption), instance_name, message_type, media_url, media_type, mime_type, audio_url, quoted_message_id, delay, split_message. Returns: confirmation with message ID."""
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(to)
-
-        if not is_allowed:
-            logger.warning(f"Blocked send attempt to {to}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
-
         client = get_client(ctx)
 
         # Log send attempt
@@ -52,20 +307,10 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         try:
             if message_type == "text":
-                # Send "composing" presence (typing indicator) before sending text
-                try:
-                    if ctx:
-                        await ctx.debug("Sending typing indicator")
-                    await client.evolution_send_presence(
-                        instance_name=instance_name,
-                        remote_jid=to,
-                        presence="composing",
-                        delay=3000  # 3 seconds
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to send presence: {e}")
-                    if ctx:
-                        await ctx.warning("Could not send typing indicator")
+                # Send "composing" presence (typing indicator) alongside the text
+                if ctx:
+                    await ctx.debug("Sending typing indicator")
+                await _start_presence(client, instance_name, to, "composing", get_config(ctx).presence_delay)
 
                 # Use Evolution API directly for all text messages to get proper message IDs
                 if ctx:
@@ -79,7 +324,7 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                     from_me=False if quoted_message_id else True,
                     delay=delay
                 )
-                message_id = response_data.get('key', {}).get('id', 'Unknown')
+                message_id = _message_id(response_data)
 
                 if ctx:
                     await ctx.info(
@@ -93,28 +338,27 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                     return "❌ Error: media_url required for media messages"
 
                 # Detect if media_url is a local file or URL
-                import os
-                import base64
-                from pathlib import Path
-                import mimetypes
-                from urllib.parse import urlparse
-
                 detected_mime = mime_type
                 detected_media_type = media_type or "image"
                 media_base64_data = None
+                media_file_data = None
                 actual_media_url = None
 
                 # Check if it's a local file path
-                if os.path.exists(media_url):
+                file_path = Path(media_url)
+                file_size = None
+                if not media_url.startswith(_REMOTE_PREFIXES):
+                    file_size = await asyncio.to_thread(_local_file_size, file_path)
+
+                if file_size is not None:
                     # It's a local file - read and encode to base64
-                    file_path = Path(media_url).absolute()
 
                     if ctx:
                         await ctx.debug(f"Detected local file: {file_path.name}")
 
                     # Auto-detect mime type if not provided
                     if not detected_mime:
-                        detected_mime, _ = mimetypes.guess_type(str(file_path))
+                        detected_mime = _guess_mime(file_path.suffix.lower())
                         if ctx and detected_mime:
                             await ctx.debug(f"Auto-detected MIME type: {detected_mime}")
 
@@ -130,21 +374,31 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                         if ctx:
                             await ctx.debug(f"Auto-detected media type: {detected_media_type}")
 
-                    # Read file and encode to base64
+                    # Large files go up as raw multipart bytes when enabled (quoted replies need the JSON body)
+                    use_multipart = (
+                        file_size >= _MULTIPART_MIN_BYTES
+                        and not quoted_message_id
+                        and get_config(ctx).evolution_multipart_upload
+                    )
+
+                    # Read file (and encode to base64 unless uploading multipart)
                     try:
-                        if ctx:
-                            await ctx.debug(f"Reading and encoding file ({file_path.stat().st_size} bytes)")
+                        if use_multipart:
+                            if ctx:
+                                await ctx.debug(f"Reading file for multipart upload ({file_size} bytes)")
+                            media_file_data = await _read_local_media(file_path)
+                        else:
+                            if ctx:
+                                await ctx.debug(f"Reading and encoding file ({file_size} bytes)")
 
-                        with open(file_path, "rb") as f:
-                            file_data = f.read()
-                            media_base64_data = base64.b64encode(file_data).decode("utf-8")
+                            media_base64_data = await _encode_local_media(file_path)
 
-                        if ctx:
-                            await ctx.debug(f"File encoded successfully (base64 length: {len(media_base64_data)})")
+                            if ctx:
+                                await ctx.debug(f"File encoded successfully (base64 length: {len(media_base64_data)})")
                     except Exception as e:
                         if ctx:
-                            await ctx.error(f"Failed to read file: {str(e)}", extra={"file_path": str(file_path)})
-                        return f"❌ Error reading file {media_url}: {str(e)}"
+                            await ctx.error(f"Failed to read file: {e}", extra={"file_path": str(file_path)})
+                        return f"❌ Error reading file {media_url}: {e}"
                 else:
                     # It's a URL - try to detect mime_type from URL path
                     actual_media_url = media_url
@@ -154,9 +408,8 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
                     # Auto-detect mime type from URL if not provided
                     if not detected_mime:
-                        parsed_url = urlparse(media_url)
-                        url_path = parsed_url.path
-                        detected_mime, _ = mimetypes.guess_type(url_path)
+                        url_path = urlparse(media_url).path
+                        detected_mime = _guess_mime(PurePosixPath(url_path).suffix.lower())
 
                         if ctx and detected_mime:
                             await ctx.debug(f"Auto-detected MIME type from URL: {detected_mime}")
@@ -177,19 +430,31 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                     await ctx.debug(f"Sending {detected_media_type} media to Evolution API")
 
                 # Use Evolution API directly for media (supports all features)
-                response_data = await client.evolution_send_media(
-                    instance_name=instance_name,
-                    remote_jid=to,
-                    media_url=actual_media_url,
-                    media_base64=media_base64_data,
-                    media_type=detected_media_type,
-                    caption=message,
-                    filename=Path(media_url).name if media_base64_data else None,
-                    mime_type=detected_mime,
-                    quoted_message_id=quoted_message_id,
-                    delay=delay
-                )
-                message_id = response_data.get('key', {}).get('id', 'Unknown')
+                if media_file_data is not None:
+                    response_data = await client.evolution_send_media_file(
+                        instance_name=instance_name,
+                        remote_jid=to,
+                        file_name=file_path.name,
+                        file_data=media_file_data,
+                        media_type=detected_media_type,
+                        caption=message,
+                        mime_type=detected_mime,
+                        delay=delay
+                    )
+                else:
+                    response_data = await client.evolution_send_media(
+                        instance_name=instance_name,
+                        remote_jid=to,
+                        media_url=actual_media_url,
+                        media_base64=media_base64_data,
+                        media_type=detected_media_type,
+                        caption=message,
+                        filename=file_path.name if media_base64_data else None,
+                        mime_type=detected_mime,
+                        quoted_message_id=quoted_message_id,
+                        delay=delay
+                    )
+                message_id = _message_id(response_data)
 
                 if ctx:
                     await ctx.info(
@@ -202,52 +467,39 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 if not audio_url:
                     return "❌ Error: audio_url required for audio messages"
 
-                # Send "recording" presence (recording indicator) before sending audio
-                try:
-                    if ctx:
-                        await ctx.debug("Sending recording indicator")
-
-                    await client.evolution_send_presence(
-                        instance_name=instance_name,
-                        remote_jid=to,
-                        presence="recording",
-                        delay=3000  # 3 seconds
-                    )
-                except Exception as e:
-                    if ctx:
-                        await ctx.warning("Could not send recording indicator")
-                    logger.warning(f"Failed to send presence: {e}")
+                # Send "recording" presence (recording indicator) alongside the audio
+                if ctx:
+                    await ctx.debug("Sending recording indicator")
+                await _start_presence(client, instance_name, to, "recording", get_config(ctx).presence_delay)
 
                 # Detect if audio_url is a local file or URL
-                import os
-                import base64
-                from pathlib import Path
-
                 audio_base64_data = None
                 actual_audio_url = None
 
                 # Check if it's a local file path
-                if os.path.exists(audio_url):
+                file_path = Path(audio_url)
+                file_size = None
+                if not audio_url.startswith(_REMOTE_PREFIXES):
+                    file_size = await asyncio.to_thread(_local_file_size, file_path)
+
+                if file_size is not None:
                     # It's a local file - read and encode to base64
-                    file_path = Path(audio_url).absolute()
 
                     if ctx:
                         await ctx.debug(f"Detected local audio file: {file_path.name}")
 
                     try:
                         if ctx:
-                            await ctx.debug(f"Reading and encoding audio ({file_path.stat().st_size} bytes)")
+                            await ctx.debug(f"Reading and encoding audio ({file_size} bytes)")
 
-                        with open(file_path, "rb") as f:
-                            file_data = f.read()
-                            audio_base64_data = base64.b64encode(file_data).decode("utf-8")
+                        audio_base64_data = await _encode_local_media(file_path)
 
                         if ctx:
                             await ctx.debug(f"Audio encoded successfully (base64 length: {len(audio_base64_data)})")
                     except Exception as e:
                         if ctx:
-                            await ctx.error(f"Failed to read audio file: {str(e)}", extra={"file_path": str(file_path)})
-                        return f"❌ Error reading audio file {audio_url}: {str(e)}"
+                            await ctx.error(f"Failed to read audio file: {e}", extra={"file_path": str(file_path)})
+                        return f"❌ Error reading audio file {audio_url}: {e}"
                 else:
                     # It's a URL
                     actual_audio_url = audio_url
@@ -295,31 +547,93 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
         except Exception as e:
             if ctx:
                 await ctx.error(
-                    f"WhatsApp message error: {str(e)}",
+                    f"WhatsApp message error: {e}",
                     extra={"recipient": to, "message_type": message_type}
                 )
             logger.error(f"Error sending WhatsApp message: {e}")
-            return f"❌ Failed to send message: {str(e)}"
+            return f"❌ Failed to send message: {e}"
 
 
     @mcp.tool()
-    async def react_with(
-        emoji: str, to_message_id: str, phone: str, instance_name: str = "genie"
-,
+    async def broadcast_whatsapp(
+        to: List[str],
+        message: str,
+        instance_name: str = "genie",
+        delay: Optional[int] = None,
+
         ctx: Optional[Context] = None,) -> str:
-        """React to message with emoji (auto-detects sender). Args: emoji, to_message_id, phone, instance_name. Returns: confirmation."""
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(phone)
+        """Send the same text message to several recipients, rate limited. Args: to (list of phones or contact IDs), message, instance_name, delay. Returns: per-recipient delivery summary."""
+        # Deduplicate while keeping the caller's order
+        recipients = list(dict.fromkeys(to))
 
-        if not is_allowed:
-            logger.warning(f"Blocked reaction attempt to {phone}: {validation_message}")
-            return validation_message
+        if not recipients:
+            return "❌ Error: no recipients given"
+
+        if len(recipients) > MAX_BROADCAST_RECIPIENTS:
+            return f"❌ Error: too many recipients ({len(recipients)}), maximum is {MAX_BROADCAST_RECIPIENTS} per broadcast"
+
+        # Safety check: validate every recipient up front, before anything is sent
+        config = get_config(ctx)
+        allowed = []
+        blocked = []
+        invalid = []
+        for recipient in recipients:
+            if not _is_valid_recipient(recipient):
+                invalid.append(recipient)
+                continue
+            is_allowed, validation_message = config.validate_recipient(recipient)
+            if is_allowed:
+                allowed.append(recipient)
+            else:
+                logger.warning(f"Blocked broadcast to {recipient}: {validation_message}")
+                blocked.append(recipient)
 
         # Show safety warning if in full access mode
         if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
+            logger.warning(FULL_ACCESS_WARNING)
+
+        client = get_client(ctx)
+        limiter = _get_broadcast_limiter(client, instance_name, config.broadcast_rate_limit)
+        semaphore = asyncio.Semaphore(max(1, config.broadcast_concurrency))
+
+        if ctx:
+            await ctx.info(f"Broadcasting to {len(allowed)} recipients via {instance_name}")
+
+        async def _send_one(recipient: str) -> str:
+            async with semaphore:
+                await limiter.acquire()
+                try:
+                    response_data = await client.evolution_send_text(
+                        instance_name=instance_name,
+                        remote_jid=recipient,
+                        text=message,
+                        delay=delay
+                    )
+                    message_id = _message_id(response_data)
+                    return f"  ✅ {recipient}: {message_id}"
+                except Exception as e:
+                    logger.error(f"Error broadcasting to {recipient}: {e}")
+                    return f"  ❌ {recipient}: {e}"
+
+        lines = await asyncio.gather(*(_send_one(recipient) for recipient in allowed))
+        for recipient in allowed:
+            evict_cached_messages(client, instance_name, recipient)
+
+        sent = sum(1 for line in lines if line.startswith("  ✅"))
+        result = [f"📣 Broadcast: {sent}/{len(recipients)} sent"]
+        result.extend(lines)
+        result.extend(f"  🚫 {recipient}: blocked by context isolation" for recipient in blocked)
+        result.extend(f"  ⚠️ {recipient}: invalid recipient format" for recipient in invalid)
+        return "\n".join(result)
 
+
+    @mcp.tool()
+    @guarded_tool("phone", action="reaction")
+    async def react_with(
+        emoji: str, to_message_id: str, phone: str, instance_name: str = "genie"
+,
+        ctx: Optional[Context] = None,) -> str:
+        """React to message with emoji (auto-detects sender). Args: emoji, to_message_id, phone, instance_name. Returns: confirmation."""
         client = get_client(ctx)
 
         try:
@@ -327,7 +641,6 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 await ctx.info(f"Reacting with {emoji} to message {to_message_id}")
 
             # Auto-detect from_me by checking message in Evolution API
-            from ..client import normalize_jid
             remote_jid = normalize_jid(phone)
 
             if ctx:
@@ -374,14 +687,15 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
         except Exception as e:
             if ctx:
                 await ctx.error(
-                    f"Reaction error: {str(e)}",
+                    f"Reaction error: {e}",
                     extra={"emoji": emoji, "message_id": to_message_id}
                 )
             logger.error(f"Error sending reaction: {e}")
-            return f"❌ Failed to send reaction: {str(e)}"
+            return f"❌ Failed to send reaction: {e}"
 
 
     @mcp.tool()
+    @guarded_tool(action="sticker send")
     async def send_sticker(
         to: str,
         sticker_url: str,
@@ -391,18 +705,6 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         ctx: Optional[Context] = None,) -> str:
         """Send WhatsApp sticker. Args: to, sticker_url, instance_name, quoted_message_id, delay. Returns: confirmation with message ID."""
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(to)
-
-        if not is_allowed:
-            logger.warning(f"Blocked sticker send attempt to {to}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
-
         client = get_client(ctx)
 
         try:
@@ -419,7 +721,7 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             )
 
             # Extract message ID from Evolution API response
-            message_id = response.get("key", {}).get("id", "Unknown")
+            message_id = _message_id(response)
 
             if ctx:
                 await ctx.info(
@@ -432,14 +734,15 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
         except Exception as e:
             if ctx:
                 await ctx.error(
-                    f"Sticker send error: {str(e)}",
+                    f"Sticker send error: {e}",
                     extra={"recipient": to, "sticker_url": sticker_url}
                 )
             logger.error(f"Error sending sticker: {e}")
-            return f"❌ Failed to send sticker: {str(e)}"
+            return f"❌ Failed to send sticker: {e}"
 
 
     @mcp.tool()
+    @guarded_tool(action="contact send")
     async def send_contact(
         to: str,
         contacts: Optional[List[Dict[str, Any]]] = None,
@@ -450,71 +753,36 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         ctx: Optional[Context] = None,) -> str:
         """Send vCard contact. Use contacts= for custom data OR contact_name= to send saved contact by name. Args: to, contacts (list of dicts: full_name, phone_number, email, organization, url), contact_name (search saved contacts), instance_name, quoted_message_id, delay. Returns: confirmation with message ID."""
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(to)
-
-        if not is_allowed:
-            logger.warning(f"Blocked contact send attempt to {to}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
+        if not contact_name and not contacts:
+            return "❌ Must provide either 'contacts' or 'contact_name' parameter"
 
         client = get_client(ctx)
 
         try:
             # If contact_name is provided, search for the contact first
             if contact_name:
-                import sqlite3
-                import os
-                from thefuzz import fuzz
-                import unicodedata
-
-                def _normalize(text: str) -> str:
-                    if not text:
-                        return ""
-                    text = unicodedata.normalize('NFD', text)
-                    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
-                    return text.lower().strip()
-
-                # Search local contacts database
+                # Search local contacts database (rows are cached pre-normalized)
                 db_path = os.getenv("AUTOMAGIK_OMNI_SQLITE_DATABASE_PATH", "/home/namastex/data/automagik-omni.db")
-                db = sqlite3.connect(db_path)
-                cursor = db.cursor()
-                cursor.execute("SELECT phone_number, name, nickname FROM contacts")
-
-                best_match = None
-                best_score = 0
-                normalized_search = _normalize(contact_name)
 
-                for phone, name, nickname in cursor.fetchall():
-                    norm_name = _normalize(name)
-                    norm_nickname = _normalize(nickname) if nickname else ""
+                saved = _load_saved_contacts(db_path)
+                normalized_search = _normalize_contact_name(contact_name)
 
-                    name_score = fuzz.partial_ratio(normalized_search, norm_name)
-                    nickname_score = fuzz.partial_ratio(normalized_search, norm_nickname) if norm_nickname else 0
-                    score = max(name_score, nickname_score)
+                # Best name and best nickname match, each scored in a single native pass
+                best_name = process.extractOne(normalized_search, saved.norm_names, scorer=fuzz.partial_ratio, score_cutoff=60)
+                best_nickname = process.extractOne(normalized_search, saved.norm_nicknames, scorer=fuzz.partial_ratio, score_cutoff=60)
+                if best_nickname and (not best_name or best_nickname[1] > best_name[1]):
+                    best_name = best_nickname
 
-                    if score > best_score:
-                        best_score = score
-                        best_match = {"phone_number": phone, "name": name}
-
-                db.close()
-
-                if not best_match or best_score < 60:
+                if not best_name:
                     return f"❌ No contact found matching '{contact_name}'"
 
                 # Build contacts list from found contact
+                phone, name = saved.rows[best_name[2]]
                 contacts = [{
-                    "full_name": best_match["name"],
-                    "phone_number": best_match["phone_number"]
+                    "full_name": name,
+                    "phone_number": phone
                 }]
 
-            elif not contacts:
-                return "❌ Must provide either 'contacts' or 'contact_name' parameter"
-
             # Continue with normal send logic
             # Use Evolution API directly to get proper message IDs
             response_data = await client.evolution_send_contact(
@@ -526,7 +794,7 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             )
 
             # Extract message ID from Evolution API response
-            message_id = response_data.get("key", {}).get("id", "Unknown")
+            message_id = _message_id(response_data)
 
             contact_count = len(contacts)
             plural = "s" if contact_count > 1 else ""
@@ -534,10 +802,11 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         except Exception as e:
             logger.error(f"Error sending contact: {e}")
-            return f"❌ Failed to send contact(s): {str(e)}"
+            return f"❌ Failed to send contact(s): {e}"
 
 
     @mcp.tool()
+    @guarded_tool(action="location send")
     async def send_location(
         to: str,
         latitude: float,
@@ -548,17 +817,10 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         ctx: Optional[Context] = None,) -> str:
         """Send location. Args: to, latitude, longitude, instance_name, name, address. Returns: confirmation with message ID."""
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(to)
-
-        if not is_allowed:
-            logger.warning(f"Blocked location send attempt to {to}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
+        if not -90 <= latitude <= 90:
+            return f"❌ Invalid latitude {latitude}: must be between -90 and 90"
+        if not -180 <= longitude <= 180:
+            return f"❌ Invalid longitude {longitude}: must be between -180 and 180"
 
         client = get_client(ctx)
 
@@ -577,14 +839,15 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             )
 
             location_desc = f" ({name})" if name else ""
-            return f"✅ Location{location_desc} sent to {to}\nCoordinates: {latitude}, {longitude}\nMessage ID: {response.get('key', {}).get('id', 'None')}"
+            return f"✅ Location{location_desc} sent to {to}\nCoordinates: {latitude}, {longitude}\nMessage ID: {_message_id(response, 'None')}"
 
         except Exception as e:
             logger.error(f"Error sending location: {e}")
-            return f"❌ Failed to send location: {str(e)}"
+            return f"❌ Failed to send location: {e}"
 
 
     @mcp.tool()
+    @guarded_tool("phone", action="delete")
     async def delete_message(
         message_id: str,
         phone: str,
@@ -593,18 +856,6 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         ctx: Optional[Context] = None,) -> str:
         """Delete message for everyone. Only works for messages from you (from_me=True), within ~48 hour window. Args: message_id, phone, instance_name, from_me. Returns: confirmation."""
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(phone)
-
-        if not is_allowed:
-            logger.warning(f"Blocked delete attempt for {phone}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
-
         client = get_client(ctx)
 
         try:
@@ -619,10 +870,11 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         except Exception as e:
             logger.error(f"Error deleting message: {e}")
-            return f"❌ Failed to delete message: {str(e)}"
+            return f"❌ Failed to delete message: {e}"
 
 
     # Internal helper - presence is automatically sent with send_whatsapp
+    @guarded_tool(action="presence send")
     async def send_presence(
         to: str,
         presence: str = "composing",
@@ -658,19 +910,7 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             # Then send your message
             send_whatsapp(to="5511999999999", message="Hello!")
         """
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(to)
-
-        if not is_allowed:
-            logger.warning(f"Blocked presence send attempt to {to}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
-
-        client = get_client(ctx)
+        client = get_client()
 
         try:
             response = await client.evolution_send_presence(
@@ -680,22 +920,17 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 delay=delay,
             )
 
-            presence_emoji = {
-                "composing": "⌨️",
-                "recording": "🎤",
-                "paused": "⏸️",
-                "available": "🟢",
-                "unavailable": "⚫"
-            }.get(presence, "📡")
+            presence_emoji = _PRESENCE_EMOJI.get(presence, "📡")
 
             return f"{presence_emoji} Presence '{presence}' sent to {to}"
 
         except Exception as e:
             logger.error(f"Error sending presence: {e}")
-            return f"❌ Failed to send presence: {str(e)}"
+            return f"❌ Failed to send presence: {e}"
 
 
     @mcp.tool()
+    @guarded_tool("phone", action="update")
     async def update_message(
         message_id: str,
         new_text: str,
@@ -733,18 +968,6 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 phone="5511999999999"
             )
         """
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(phone)
-
-        if not is_allowed:
-            logger.warning(f"Blocked update attempt for {phone}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
-
         client = get_client(ctx)
 
         try:
@@ -760,7 +983,7 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
 
         except Exception as e:
             logger.error(f"Error updating message: {e}")
-            return f"❌ Failed to update message: {str(e)}"
+            return f"❌ Failed to update message: {e}"
 
 
     @mcp.tool()
@@ -789,39 +1012,64 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
         """
         client = get_client(ctx)
 
-        try:
-            response = await client.evolution_check_is_whatsapp(
-                instance_name=instance_name,
-                phone_numbers=phone_numbers,
-            )
-
-            # Format response for readability
-            result_lines = ["📱 WhatsApp Number Check:\n"]
-
-            # Response format varies, handle both formats
-            if isinstance(response, list):
-                for item in response:
-                    number = item.get("jid", item.get("number", "Unknown"))
-                    exists = item.get("exists", False)
-                    status = "✅ On WhatsApp" if exists else "❌ Not on WhatsApp"
-                    result_lines.append(f"  {number}: {status}")
-            elif isinstance(response, dict) and "results" in response:
-                for item in response["results"]:
-                    number = item.get("jid", item.get("number", "Unknown"))
-                    exists = item.get("exists", False)
-                    status = "✅ On WhatsApp" if exists else "❌ Not on WhatsApp"
-                    result_lines.append(f"  {number}: {status}")
+        # Deduplicate, then answer what we can from the per-number status cache
+        numbers = list(dict.fromkeys(phone_numbers))
+        now = time.monotonic()
+        statuses: Dict[str, tuple] = {}
+        scope = (client.base_url, client.config.api_key, instance_name)
+        missing = []
+        for number in numbers:
+            key = (*scope, number)
+            cached = _wa_status_cache.get(key)
+            if cached and now - cached[2] < _WA_STATUS_TTL:
+                _wa_status_cache.move_to_end(key)
+                statuses[number] = cached[:2]
             else:
-                result_lines.append(f"  Raw response: {response}")
+                missing.append(number)
+        missing_set = set(missing)
+
+        try:
+            extra = []
+            if missing:
+                response = await client.evolution_check_is_whatsapp(
+                    instance_name=instance_name,
+                    phone_numbers=missing,
+                )
 
-            return "\n".join(result_lines)
+                # Response format varies, pick the item list once
+                if isinstance(response, list):
+                    items = response
+                elif isinstance(response, dict) and "results" in response:
+                    items = response["results"]
+                else:
+                    return f"📱 WhatsApp Number Check:\n\n  Raw response: {response}"
+
+                for item in items:
+                    status = (item.get("jid", item.get("number", "Unknown")), bool(item.get("exists")))
+                    number = item.get("number")
+                    if number in missing_set:
+                        statuses[number] = status
+                        key = (*scope, number)
+                        _wa_status_cache[key] = (*status, now)
+                        _wa_status_cache.move_to_end(key)
+                    else:
+                        extra.append(status)
+                while len(_wa_status_cache) > _WA_STATUS_CACHE_SIZE:
+                    _wa_status_cache.popitem(last=False)
+
+            body = "\n".join(
+                f"  {label}: {'✅ On WhatsApp' if exists else '❌ Not on WhatsApp'}"
+                for label, exists in [statuses[n] for n in numbers if n in statuses] + extra
+            )
+            return f"📱 WhatsApp Number Check:\n\n{body}"
 
         except Exception as e:
             logger.error(f"Error checking WhatsApp numbers: {e}")
-            return f"❌ Failed to check WhatsApp numbers: {str(e)}"
+            return f"❌ Failed to check WhatsApp numbers: {e}"
 
 
     @mcp.tool()
+    @guarded_tool(action="poll send")
     async def send_poll(
         to: str,
         question: str,
@@ -857,17 +1105,10 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 selectable_count=1
             )
         """
-        # Safety check: validate recipient against master context
-        config = get_config(ctx)
-        is_allowed, validation_message = config.validate_recipient(to)
-
-        if not is_allowed:
-            logger.warning(f"Blocked poll send attempt to {to}: {validation_message}")
-            return validation_message
-
-        # Show safety warning if in full access mode
-        if not config.has_master_context():
-            logger.warning(config.get_safety_warning())
+        if len(options) < 2:
+            return "❌ Poll requires at least 2 options"
+        if not 1 <= selectable_count <= len(options):
+            return f"❌ selectable_count must be between 1 and {len(options)}"
 
         client = get_client(ctx)
 
@@ -881,11 +1122,11 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             )
 
             poll_type = "single choice" if selectable_count == 1 else f"multiple choice (max {selectable_count})"
-            return f"📊 Poll sent to {to}\nQuestion: {question}\nOptions: {len(options)} ({poll_type})\nMessage ID: {response.get('key', {}).get('id', 'None')}"
+            return f"📊 Poll sent to {to}\nQuestion: {question}\nOptions: {len(options)} ({poll_type})\nMessage ID: {_message_id(response, 'None')}"
 
         except Exception as e:
             logger.error(f"Error sending poll: {e}")
-            return f"❌ Failed to send poll: {str(e)}"
+            return f"❌ Failed to send poll: {e}"
 
 
     # =============================================================================
@@ -1,14 +1,170 @@
 """Multimodal tools - Audio, voice, and multimedia capabilities."""
 
+import asyncio
+import json
 import logging
 import os
+import random
+import time
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, Optional
 import httpx
 from fastmcp import FastMCP, Context
 
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+from .reading import evict_cached_messages
+
 logger = logging.getLogger(__name__)
 
+# WhatsApp voice note encoding: mono 16 kHz Opus at 32 kbps in an OGG container
+_VOICE_NOTE_FFMPEG_ARGS = ("-c:a", "libopus", "-ar", "16000", "-ac", "1", "-b:a", "32k", "-f", "ogg")
+
+
+# ElevenLabs output format for talk(): raw 16 kHz PCM is only encoded, never decoded or
+# resampled. Set XI_OUTPUT_FORMAT=mp3_44100_128 to fall back to the MP3 stream.
+_DEFAULT_TTS_OUTPUT_FORMAT = "pcm_16000"
+
+
+def _ffmpeg_input_args(output_format: str) -> tuple:
+    """ffmpeg input options for an ElevenLabs output format (raw PCM carries no header)."""
+    if output_format.startswith("pcm_"):
+        return ("-f", "s16le", "-ar", output_format.split("_", 1)[1], "-ac", "1")
+    return ()
+
+
+# Concurrent ffmpeg processes across talk() calls; network stages are not limited
+_TRANSCODE_SLOTS = asyncio.Semaphore(max(2, (os.cpu_count() or 2) // 2))
+
+
+async def _transcode_to_voice_note(audio: bytes, input_args: tuple = ()) -> bytes:
+    """Transcode audio to OGG/Opus with a single ffmpeg process (stdin -> stdout, no temp files)."""
+    async with _TRANSCODE_SLOTS:
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            *input_args, "-i", "pipe:0", *_VOICE_NOTE_FFMPEG_ARGS, "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        ogg, stderr = await process.communicate(audio)
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace').strip()}")
+    return ogg
+
+
+# Longest server-requested Retry-After wait honored between attempts
+_RETRY_MAX_WAIT = 30.0
+
+
+def _is_retryable(response: httpx.Response) -> bool:
+    """Rate limiting and server errors are transient; other statuses are final."""
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _is_retryable_send(response: httpx.Response) -> bool:
+    """Statuses where the server did not accept a message send, so resending cannot duplicate it."""
+    return response.status_code in (429, 503)
+
+
+async def _post_with_retry(
+    http_client: httpx.AsyncClient,
+    url: str,
+    retries: int,
+    is_retryable: Callable[[httpx.Response], bool] = _is_retryable,
+    **kwargs: Any,
+) -> httpx.Response:
+    """POST, retrying connect errors and is_retryable statuses with jittered exponential backoff (honors Retry-After).
+
+    The default retries 429 and any 5xx, which suits idempotent requests such
+    as TTS generation. Message sends pass _is_retryable_send: a 500/502/504
+    may come after the message was already delivered.
+    """
+    for attempt in range(retries + 1):
+        delay = min(0.5 * 2 ** attempt, 4.0) + random.uniform(0, 0.25)
+        try:
+            response = await http_client.post(url, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # The request never reached the server, so retrying cannot duplicate it
+            if attempt == retries:
+                raise
+            logger.warning(f"POST {url} failed ({e}), retrying in {delay:.1f}s")
+        else:
+            if attempt == retries or not is_retryable(response):
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                delay = min(float(retry_after), _RETRY_MAX_WAIT)
+            logger.warning(f"POST {url} returned {response.status_code}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+# Instances with Evolution credentials: (omni url, api key, instance_name) -> (instance, fetched_at monotonic)
+_EVOLUTION_INSTANCE_TTL = 60
+_evolution_instance_cache: Dict[tuple, tuple] = {}
+
+
+def _instance_cache_key(client: Any, instance_name: str) -> tuple:
+    # Scoped to the Omni server and key: multi-tenant hubs run one client per user
+    return (client.base_url, client.config.api_key, instance_name)
+
+
+async def _get_evolution_instance(client: Any, instance_name: str) -> Any:
+    """Return the instance (for evolution_url/evolution_key), reusing a recent lookup."""
+    key = _instance_cache_key(client, instance_name)
+    cached = _evolution_instance_cache.get(key)
+    if cached and time.monotonic() - cached[1] < _EVOLUTION_INSTANCE_TTL:
+        return cached[0]
+    instance = await client.get_instance(instance_name, include_status=False)
+    if instance.evolution_url and instance.evolution_key:
+        _evolution_instance_cache[key] = (instance, time.monotonic())
+    return instance
+
+
+def _media_json_body(payload: Dict[str, Any], media: bytes) -> bytes:
+    """JSON body for payload plus a base64 "media" field spliced in as raw bytes.
+
+    Base64 output never needs JSON escaping, so the multi-MB string is neither
+    decoded to str nor scanned by the JSON encoder.
+    """
+    fields = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return b'{"media":"' + b64encode(media) + b'",' + fields[1:]
+
+
+@lru_cache(maxsize=16)
+def _ensure_dir(path: str) -> Path:
+    """Create a directory once per process; later calls skip the mkdir syscalls."""
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _save_voice_message(path: Path, audio: bytes) -> None:
+    """Write a voice note to disk, creating its folder if needed (run off the event loop)."""
+    _ensure_dir(str(path.parent))
+    try:
+        path.write_bytes(audio)
+    except FileNotFoundError:
+        # Folder removed since it was cached: recreate it
+        _ensure_dir.cache_clear()
+        _ensure_dir(str(path.parent))
+        path.write_bytes(audio)
+
+
+async def _keep_voice_message(path: Path, audio: bytes) -> str:
+    """Save a copy of the voice note; returns the "Audio saved at" line for the result."""
+    try:
+        await asyncio.to_thread(_save_voice_message, path, audio)
+    except OSError as e:
+        logger.warning(f"Could not save voice note to {path}: {e}")
+        return ""
+    return f"\nAudio saved at: {path}"
+
+
 def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
     """Register multimodal tools with the MCP server."""
 
@@ -50,14 +206,13 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
         if similarity_boost is None:
             similarity_boost = 0.75
 
-        # Create output directory (use configured folder + voice-messages subdirectory)
+        # Voice note copy location (configured folder + voice-messages subdirectory);
+        # written when sending fails, or always with OMNI_SAVE_VOICE_MESSAGES
         output_dir = Path(config.media_download_folder) / "voice-messages"
-        output_dir.mkdir(parents=True, exist_ok=True)
 
         # Generate temporary filename
-        from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"talk_{timestamp}.mp3"
+        filename = f"talk_{timestamp}.ogg"
         output_path = output_dir / filename
 
         # Step 1: Generate speech using ElevenLabs
@@ -76,13 +231,28 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
             },
         }
 
-        params = {"output_format": "mp3_44100_128"}
+        output_format = os.getenv("XI_OUTPUT_FORMAT", _DEFAULT_TTS_OUTPUT_FORMAT)
+        params = {"output_format": output_format}
+
+        # Show "recording" and look up the Evolution credentials while the speech is generated
+        side_calls = asyncio.gather(
+            client.evolution_send_presence(
+                instance_name=instance_name,
+                remote_jid=to,
+                presence="recording",
+                delay=1200  # ~1 second
+            ),
+            _get_evolution_instance(client, instance_name),
+            return_exceptions=True,
+        )
 
         try:
             # Generate audio
-            async with httpx.AsyncClient() as http_client:
-                response = await http_client.post(
+            async with client.http_session() as http_client:
+                response = await _post_with_retry(
+                    http_client,
                     url,
+                    config.max_retries,
                     headers=headers,
                     json=body,
                     params=params,
@@ -92,67 +262,38 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                 if response.status_code != 200:
                     return f"❌ ElevenLabs API error: {response.status_code}\n{response.text}"
 
-                # Save audio file and prepare for sending
-                audio_content = response.content
-                with open(output_path, "wb") as f:
-                    f.write(audio_content)
+            # Encode to OGG/Opus (WhatsApp native voice note format), in memory end to end
+            audio_content = await _transcode_to_voice_note(
+                response.content, _ffmpeg_input_args(output_format)
+            )
 
-                file_size = len(audio_content) / 1024
+            file_size = len(audio_content) / 1024
 
             # Step 2: Send to WhatsApp with automatic presence (recording)
-            # Show "recording" presence before sending
-            try:
-                await client.evolution_send_presence(
-                    instance_name=instance_name,
-                    remote_jid=to,
-                    presence="recording",
-                    delay=1200  # ~1 second
-                )
-            except Exception as e:
-                logger.warning(f"Failed to send presence: {e}")
+            presence_result, instance = await side_calls
+            if isinstance(presence_result, Exception):
+                logger.warning(f"Failed to send presence: {presence_result}")
 
             # Send audio via Evolution API directly (bypassing Omni server)
             try:
-                # Get Evolution API credentials
-                instance = await client.get_instance(instance_name, include_status=False)
+                if isinstance(instance, Exception):
+                    raise instance
 
                 if not instance.evolution_url or not instance.evolution_key:
+                    saved_at = await _keep_voice_message(output_path, audio_content)
                     return (
                         f"✅ Speech generated ({file_size:.2f} KB)\n"
-                        f"❌ Evolution API not configured for instance '{instance_name}'\n"
-                        f"Audio saved at: {output_path}"
+                        f"❌ Evolution API not configured for instance '{instance_name}'{saved_at}"
                     )
 
-                # Convert MP3 to OGG/Opus for WhatsApp voice notes
-                from pydub import AudioSegment
-                import base64
-
-                # Convert to OGG/Opus format (WhatsApp native voice note format)
-                ogg_path = output_path.with_suffix(".ogg")
-                audio = AudioSegment.from_mp3(str(output_path))
-                audio.export(
-                    str(ogg_path),
-                    format="ogg",
-                    codec="libopus",
-                    parameters=["-ar", "16000", "-ac", "1", "-b:a", "32k"]  # WhatsApp optimal settings
-                )
-
-                # Read the converted audio
-                with open(ogg_path, "rb") as f:
-                    audio_content = f.read()
-
-                # Encode audio as base64
-                audio_base64 = base64.b64encode(audio_content).decode("utf-8")
-
                 # Call Evolution API directly
-                async with httpx.AsyncClient(timeout=30.0) as http_client:
+                async with client.http_session() as http_client:
                     evolution_url = f"{instance.evolution_url}/message/sendMedia/{instance_name}"
 
                     # Build payload with required fields
                     payload = {
                         "number": to,
                         "mediatype": "audio",
-                        "media": audio_base64,
                         "mimetype": "audio/ogg; codecs=opus",  # WhatsApp voice note format
                         "ptt": True
                     }
@@ -174,19 +315,52 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                     if mentioned and len(mentioned) > 0:
                         payload["mentioned"] = mentioned
 
-                    headers = {
-                        "apikey": instance.evolution_key,
-                        "Content-Type": "application/json"
-                    }
-
                     logger.info(f"Sending audio to Evolution API: {evolution_url}")
 
-                    response = await http_client.post(
-                        evolution_url,
-                        headers=headers,
-                        json=payload
-                    )
+                    response = None
+                    # Raw upload skips base64 (~33% fewer bytes); quotes/mention lists need the JSON body
+                    if config.evolution_multipart_upload and not quoted_message_id and not mentioned:
+                        form = {
+                            key: "true" if value is True else str(value)
+                            for key, value in payload.items()
+                        }
+                        form["fileName"] = filename
+                        response = await _post_with_retry(
+                            http_client,
+                            evolution_url,
+                            config.max_retries,
+                            is_retryable=_is_retryable_send,
+                            headers={"apikey": instance.evolution_key},
+                            data=form,
+                            files={"file": (filename, audio_content, payload["mimetype"])},
+                            timeout=30.0,
+                        )
+                        if response.status_code in (400, 415):
+                            logger.warning(
+                                f"Evolution rejected multipart upload ({response.status_code}), resending as base64"
+                            )
+                            response = None
+
+                    if response is None:
+                        # Base64 + JSON encoding off the event loop (voice notes can be several MB)
+                        body = await asyncio.to_thread(_media_json_body, payload, audio_content)
+
+                        headers = {
+                            "apikey": instance.evolution_key,
+                            "Content-Type": "application/json"
+                        }
+
+                        response = await _post_with_retry(
+                            http_client,
+                            evolution_url,
+                            config.max_retries,
+                            is_retryable=_is_retryable_send,
+                            headers=headers,
+                            content=body,
+                            timeout=30.0,
+                        )
 
+                    evict_cached_messages(client, instance_name, to)
                     response.raise_for_status()
                     result = response.json()
 
@@ -196,6 +370,8 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                     message_id = result.get("key", {}).get("id") if isinstance(result, dict) else None
 
                     if message_id:
+                        if config.save_voice_messages:
+                            await _keep_voice_message(output_path, audio_content)
                         return (
                             f"🎙️ Talked to {to} successfully!\n"
                             f"Speech: {text[:80]}{'...' if len(text) > 80 else ''}\n"
@@ -205,29 +381,38 @@ def register_tools(mcp: FastMCP, get_client: Callable, get_config: Callable):
                             f"Status: Delivered ✅"
                         )
                     else:
+                        # Unexpected response shape: keep the audio in case it was not delivered
+                        saved_at = await _keep_voice_message(output_path, audio_content)
                         return (
                             f"✅ Speech generated ({file_size:.2f} KB)\n"
                             f"✅ Sent via Evolution API\n"
-                            f"Response: {result}\n"
-                            f"Audio saved at: {output_path}"
+                            f"Response: {result}{saved_at}"
                         )
 
             except httpx.HTTPStatusError as http_error:
+                if http_error.response.status_code in (401, 403):
+                    # Credentials may have been rotated; look them up again next time
+                    _evolution_instance_cache.pop(_instance_cache_key(client, instance_name), None)
                 logger.error(f"Evolution API HTTP error: {http_error.response.status_code} - {http_error.response.text}")
+                saved_at = await _keep_voice_message(output_path, audio_content)
                 return (
                     f"✅ Speech generated ({file_size:.2f} KB)\n"
                     f"❌ Evolution API error: {http_error.response.status_code}\n"
-                    f"Response: {http_error.response.text}\n"
-                    f"Audio saved at: {output_path}"
+                    f"Response: {http_error.response.text}{saved_at}"
                 )
             except Exception as send_error:
                 logger.error(f"Exception during WhatsApp send: {send_error}", exc_info=True)
+                saved_at = await _keep_voice_message(output_path, audio_content)
                 return (
                     f"✅ Speech generated ({file_size:.2f} KB)\n"
-                    f"❌ WhatsApp send error: {str(send_error)}\n"
-                    f"Audio saved at: {output_path}"
+                    f"❌ WhatsApp send error: {str(send_error)}{saved_at}"
                 )
 
         except Exception as e:
             logger.error(f"Error in talk: {e}")
             return f"❌ Failed to talk: {str(e)}"
+        finally:
+            if not side_calls.done():
+                # Generation failed before the side calls were awaited: stop them quietly
+                side_calls.cancel()
+                side_calls.add_done_callback(lambda f: f.cancelled() or f.exception())
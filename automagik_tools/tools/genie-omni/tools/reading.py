@@ -1,12 +1,113 @@
 """Reading tools - What messages have I received?"""
 
 import logging
+import time
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Callable, Dict, List, Any, Optional
 from fastmcp import FastMCP, Context
+from ..models import TraceFilter
 
 logger = logging.getLogger(__name__)
 
 
+# findMessages responses: (omni url, api key, instance, from_phone, limit) -> (response, fetched_at monotonic)
+_MESSAGES_TTL = 15
+_MESSAGES_CACHE_SIZE = 128
+_messages_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+async def _find_messages(client: Any, instance_name: str, from_phone: str, limit: int) -> Dict[str, Any]:
+    """evolution_find_messages, reusing a response fetched in the last few seconds.
+
+    Agents often re-read the same conversation while exploring context; a
+    short TTL turns those probes into memory hits without hiding new
+    messages for long. Send tools call evict_cached_messages so the agent's
+    own messages show up right away.
+    """
+    key = (client.base_url, client.config.api_key, instance_name, from_phone, limit)
+    cached = _messages_cache.get(key)
+    if cached and time.monotonic() - cached[1] < _MESSAGES_TTL:
+        _messages_cache.move_to_end(key)
+        return cached[0]
+
+    response = await client.evolution_find_messages(instance_name, from_phone, limit=limit)
+    _messages_cache[key] = (response, time.monotonic())
+    _messages_cache.move_to_end(key)
+    while len(_messages_cache) > _MESSAGES_CACHE_SIZE:
+        _messages_cache.popitem(last=False)
+    return response
+
+
+def _chat_key(phone_or_jid: str) -> str:
+    """Phone/group ID without "+" or the @ suffix, so "5511..." and "5511...@s.whatsapp.net" match."""
+    return phone_or_jid.split("@", 1)[0].lstrip("+")
+
+
+def evict_cached_messages(client: Any, instance_name: str, chat: str) -> None:
+    """Forget cached findMessages responses for a chat after something was sent to it."""
+    scope = (client.base_url, client.config.api_key, instance_name)
+    target = _chat_key(chat)
+    stale = [key for key in _messages_cache if key[:3] == scope and _chat_key(key[3]) == target]
+    for key in stale:
+        del _messages_cache[key]
+
+
+@lru_cache(maxsize=4096)
+def _format_minute(minute_ts: int) -> str:
+    """Local "YYYY-MM-DD HH:MM" for a Unix timestamp in minutes (messages in one minute share it)."""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(minute_ts * 60))
+
+
+def _sender_phone(key: Dict[str, Any]) -> str:
+    """Sender phone/LID: the group participant, else the DM remoteJid (never a group ID)."""
+    phone_number = key.get("participant")
+    if not phone_number:
+        remote_jid = key.get("remoteJid", "")
+        if remote_jid.endswith("@g.us"):
+            return "Unknown"
+        phone_number = remote_jid
+    # Drop the @s.whatsapp.net / @lid suffix
+    return phone_number.split("@", 1)[0]
+
+
+def _format_message(msg: Dict[str, Any]) -> str:
+    """Render one Evolution message record as a read_messages entry (header, text, ID)."""
+    key = msg.get("key", {})
+
+    timestamp = msg.get("messageTimestamp", 0)
+    time_str = _format_minute(int(timestamp) // 60) if timestamp else "?"
+
+    # Extract text content and mentions
+    msg_type = msg.get("messageType", "unknown")
+    message_content = msg.get("message", {})
+    text = ""
+    mentions = ()
+    if "conversation" in message_content:
+        text = message_content["conversation"]
+    elif "extendedTextMessage" in message_content:
+        ext_msg = message_content["extendedTextMessage"]
+        text = ext_msg.get("text", "")
+        mentions = ext_msg.get("contextInfo", {}).get("mentionedJid", [])
+
+    # Format sender: pushName (phone/LID)
+    if key.get("fromMe", False):
+        sender_label = "You"
+    else:
+        sender_label = f"{msg.get('pushName', 'Unknown')} ({_sender_phone(key)})"
+
+    type_tag = f"[{msg_type}]" if msg_type != "conversation" else ""
+    mention_tag = f" @{len(mentions)}" if mentions else ""
+    # Truncate long messages
+    if len(text) > 100:
+        text_line = f"  {text[:100]}...\n"
+    else:
+        text_line = f"  {text}\n" if text else ""
+
+    return f"[{time_str}] {sender_label}{mention_tag} {type_tag}\n{text_line}  ID: {key.get('id', '?')}\n"
+
+
 def register_tools(mcp: FastMCP, get_client: Callable):
     """Register message reading tools with the MCP server."""
 
@@ -23,11 +124,11 @@ def register_tools(mcp: FastMCP, get_client: Callable):
 
         try:
             # Use Evolution API directly for message history (Omni traces don't support groups)
-            response = await client.evolution_find_messages(instance_name, from_phone, limit=limit)
+            response = await _find_messages(client, instance_name, from_phone, limit)
 
             messages_data = response.get("messages", {})
             records = messages_data.get("records", [])
-            # Apply limit client-side since Evolution API ignores it
+            # Older Evolution versions ignore the page size, so cap client-side too
             records = records[:limit]
             total = messages_data.get("total", 0)
 
@@ -36,72 +137,7 @@ def register_tools(mcp: FastMCP, get_client: Callable):
 
             result = [f"📱 MESSAGES: {from_phone} ({total} total, showing {len(records)})"]
             result.append("")
-
-            for msg in records:
-                # Extract message details
-                key = msg.get("key", {})
-                sender_name = msg.get("pushName", "Unknown")
-                from_me = key.get("fromMe", False)
-
-                # Get timestamp
-                timestamp = msg.get("messageTimestamp", 0)
-                if timestamp:
-                    from datetime import datetime
-                    dt = datetime.fromtimestamp(timestamp)
-                    time_str = dt.strftime("%Y-%m-%d %H:%M")
-                else:
-                    time_str = "?"
-
-                # Get message content
-                msg_type = msg.get("messageType", "unknown")
-                message_content = msg.get("message", {})
-
-                # Extract text content and mentions
-                text = ""
-                mentions = []
-                if "conversation" in message_content:
-                    text = message_content["conversation"]
-                elif "extendedTextMessage" in message_content:
-                    ext_msg = message_content["extendedTextMessage"]
-                    text = ext_msg.get("text", "")
-                    # Check for mentions in contextInfo
-                    context_info = ext_msg.get("contextInfo", {})
-                    mentions = context_info.get("mentionedJid", [])
-
-                # Extract phone number: for groups, use participant; for DMs, use remoteJid
-                # Priority: participant (group member) > remoteJid (DM or group ID)
-                phone_number = key.get("participant")
-                if not phone_number:
-                    remote_jid = key.get("remoteJid", "")
-                    # Don't use group ID as phone number (groups end with @g.us)
-                    if not remote_jid.endswith("@g.us"):
-                        phone_number = remote_jid
-                    else:
-                        phone_number = "Unknown"
-
-                # Clean phone number (remove @s.whatsapp.net or @lid suffix)
-                if phone_number and "@" in phone_number:
-                    phone_number = phone_number.split("@")[0]
-
-                # Format sender: pushName (phone/LID)
-                if from_me:
-                    sender_label = "You"
-                else:
-                    sender_label = f"{sender_name} ({phone_number})"
-                message_id = key.get("id", "?")
-
-                # Build compact message line
-                type_tag = f"[{msg_type}]" if msg_type != "conversation" else ""
-                mention_tag = f" @{len(mentions)}" if mentions else ""
-                result.append(f"[{time_str}] {sender_label}{mention_tag} {type_tag}")
-
-                if text:
-                    # Truncate long messages
-                    display_text = text[:100] + "..." if len(text) > 100 else text
-                    result.append(f"  {display_text}")
-
-                result.append(f"  ID: {message_id}")
-                result.append("")
+            result.extend(map(_format_message, records))
 
             return "\n".join(result)
 
@@ -118,10 +154,6 @@ def register_tools(mcp: FastMCP, get_client: Callable):
         client = get_client(ctx)
 
         try:
-            from datetime import datetime, timedelta, timezone
-            # Import models from parent package
-            from ..models import TraceFilter
-
             start_time = datetime.now(timezone.utc) - timedelta(hours=hours)
 
             filters = TraceFilter(
@@ -136,22 +168,24 @@ def register_tools(mcp: FastMCP, get_client: Callable):
             result = [f"📱 NEW MESSAGES ({len(traces)} in last {hours}h)"]
             result.append("")
 
-            # Group by sender
-            by_sender: Dict[str, List[Any]] = {}
+            # Group by sender: full count, but only the first 3 messages are kept for display
+            counts: Counter = Counter()
+            by_sender: Dict[str, List[Any]] = defaultdict(list)
             for trace in traces:
                 sender = trace.sender_name or trace.sender_phone
-                if sender not in by_sender:
-                    by_sender[sender] = []
-                by_sender[sender].append(trace)
+                counts[sender] += 1
+                if counts[sender] <= 3:
+                    by_sender[sender].append(trace)
 
             for sender, msgs in by_sender.items():
-                result.append(f"👤 {sender} ({len(msgs)})")
-                for msg in msgs[:3]:  # Show max 3 per sender
+                count = counts[sender]
+                result.append(f"👤 {sender} ({count})")
+                for msg in msgs:
                     timestamp = msg.received_at.strftime("%H:%M") if msg.received_at else "?"
                     msg_type = msg.message_type or "?"
                     result.append(f"  [{timestamp}] {msg_type}")
-                if len(msgs) > 3:
-                    result.append(f"  +{len(msgs) - 3} more")
+                if count > 3:
+                    result.append(f"  +{count - 3} more")
                 result.append("")
 
             return "\n".join(result)
@@ -4,9 +4,11 @@ Google Workspace MCP Tool
 Comprehensive Google Workspace integration for Calendar, Gmail, Docs, Sheets, Slides, Drive, Chat, Forms, Tasks & Search.
 """
 
+import importlib
 import logging
-import os
-from typing import Optional
+from typing import Dict, List, Optional
+
+from automagik_tools.tools.google_workspace_core.config import apply_config_env
 
 from .config import GoogleWorkspaceConfig
 
@@ -18,6 +20,29 @@ logger = logging.getLogger(__name__)
 # Global configuration
 config: Optional[GoogleWorkspaceConfig] = None
 
+# Service name -> module registering its tools (imported only when enabled)
+_SERVICE_MODULES: Dict[str, str] = {
+    "gmail": ".services.gmail_tools",
+    "drive": ".services.drive_tools",
+    "calendar": ".services.calendar_tools",
+    "docs": ".services.docs_tools",
+    "sheets": ".services.sheets_tools",
+    "chat": ".services.chat_tools",
+    "search": ".services.search_tools",
+    "forms": ".services.forms_tools",
+    "tasks": ".services.tasks_tools",
+    "slides": ".services.slides_tools",
+}
+
+_CORE_SERVICES = ["gmail", "drive", "calendar", "docs", "sheets", "chat", "search"]
+
+# Services enabled per tool tier
+_TIER_SERVICES: Dict[str, List[str]] = {
+    "core": _CORE_SERVICES,
+    "extended": _CORE_SERVICES + ["forms", "tasks"],
+    "complete": list(_SERVICE_MODULES),
+}
+
 
 def create_server(cfg: Optional[GoogleWorkspaceConfig] = None):
     """
@@ -34,26 +59,12 @@ def create_server(cfg: Optional[GoogleWorkspaceConfig] = None):
     # Load configuration
     config = cfg or GoogleWorkspaceConfig()
 
-    # Set environment variables for Google Workspace modules
-    if config.client_id:
-        os.environ["GOOGLE_OAUTH_CLIENT_ID"] = config.client_id
-    if config.client_secret:
-        os.environ["GOOGLE_OAUTH_CLIENT_SECRET"] = config.client_secret
-    os.environ["GOOGLE_MCP_CREDENTIALS_DIR"] = os.path.expanduser(
-        config.credentials_dir
-    )
-    os.environ["USER_GOOGLE_EMAIL"] = config.user_email or ""
-    os.environ["MCP_ENABLE_OAUTH21"] = str(config.enable_oauth21).lower()
-    os.environ["MCP_SINGLE_USER_MODE"] = str(config.single_user_mode).lower()
-    os.environ["WORKSPACE_MCP_STATELESS_MODE"] = str(config.stateless_mode).lower()
-    os.environ["WORKSPACE_MCP_BASE_URI"] = config.base_uri
-    os.environ["WORKSPACE_MCP_PORT"] = str(config.port)
-    os.environ["WORKSPACE_MCP_LOG_LEVEL"] = config.log_level
+    # Set environment variables for Google Workspace modules; the OAuth config
+    # reload is skipped when the environment already matches (repeated calls)
+    if apply_config_env(config):
+        from .auth.oauth_config import reload_oauth_config
 
-    # Reload OAuth configuration
-    from .auth.oauth_config import reload_oauth_config
-
-    reload_oauth_config()
+        reload_oauth_config()
 
     # Import the pre-configured server from core
     from .core.server import server, set_transport_mode, configure_server_for_http
@@ -61,8 +72,9 @@ def create_server(cfg: Optional[GoogleWorkspaceConfig] = None):
     # Set transport mode
     set_transport_mode("stdio")
 
-    # Import and register tools based on tier
-    _register_tools(config.tool_tier)
+    # Import and register tools of the services enabled by the tier
+    enabled_services = _TIER_SERVICES.get(config.tool_tier, _TIER_SERVICES["complete"])
+    _register_tools(enabled_services)
 
     # Configure tool registry
     from .core.tool_registry import (
@@ -75,28 +87,6 @@ def create_server(cfg: Optional[GoogleWorkspaceConfig] = None):
     # Wrap server tool method
     wrap_server_tool_method(server)
 
-    # Determine which services to enable based on tool tier
-    all_services = [
-        "gmail",
-        "drive",
-        "calendar",
-        "docs",
-        "sheets",
-        "chat",
-        "forms",
-        "slides",
-        "tasks",
-        "search",
-    ]
-    core_services = ["gmail", "drive", "calendar", "docs", "sheets", "chat", "search"]
-
-    if config.tool_tier == "core":
-        enabled_services = core_services
-    elif config.tool_tier == "extended":
-        enabled_services = core_services + ["forms", "tasks"]
-    else:  # complete
-        enabled_services = all_services
-
     set_enabled_tools(enabled_services)
     set_enabled_tool_names(None)  # Enable all tools within selected services
 
@@ -112,34 +102,19 @@ def create_server(cfg: Optional[GoogleWorkspaceConfig] = None):
     return server
 
 
-def _register_tools(tier: str):
+def _register_tools(services: List[str]):
     """
-    Register Google Workspace tools based on tier.
+    Register the tools of the given Google Workspace services.
 
     Args:
-        tier: Tool tier (core, extended, complete)
+        services: Service names (keys of _SERVICE_MODULES)
 
     Note:
         Imports are used for side-effects (tool registration via @server.tool decorators).
-        The modules self-register when imported, so we don't use the imported names directly.
+        Only the modules of enabled services are imported.
     """
-    # Core tools (always loaded) - imported for side-effects (tool registration)
-    from .services import gmail_tools  # noqa: F401
-    from .services import drive_tools  # noqa: F401
-    from .services import calendar_tools  # noqa: F401
-    from .services import docs_tools  # noqa: F401
-    from .services import sheets_tools  # noqa: F401
-    from .services import chat_tools  # noqa: F401
-    from .services import search_tools  # noqa: F401
-
-    # Extended tools
-    if tier in ["extended", "complete"]:
-        from .services import forms_tools  # noqa: F401
-        from .services import tasks_tools  # noqa: F401
-
-    # Complete tools
-    if tier == "complete":
-        from .services import slides_tools  # noqa: F401
+    for service in services:
+        importlib.import_module(_SERVICE_MODULES[service], __name__)
 
 
 def get_config_class():
@@ -5,15 +5,73 @@ Inspired by FastMCP's check_if_auth_required function. Provides utilities
 to detect if an endpoint requires authentication before making requests.
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 import asyncio
 import httpx
 import logging
+import re
 import threading
+import time
+import atexit
+import weakref
 from functools import wraps
 
 logger = logging.getLogger(__name__)
 
+# Responses meaning the endpoint wants credentials (Unauthorized, Forbidden)
+_AUTH_REQUIRED_STATUSES = frozenset({401, 403})
+
+# Clients reused by auth checks without custom httpx arguments, so repeated
+# checks keep their connections alive. Async clients are bound to the event
+# loop that created them, hence one per loop, stored with the async generator
+# that closes the client when the loop shuts down.
+_shared_sync_client: Optional[httpx.Client] = None
+# Maps event loop -> (client, closer generator)
+_shared_async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _get_shared_sync_client() -> httpx.Client:
+    """Return the shared sync client (created on first use)."""
+    global _shared_sync_client
+
+    if _shared_sync_client is None or _shared_sync_client.is_closed:
+        _shared_sync_client = httpx.Client()
+    return _shared_sync_client
+
+
+async def _close_on_loop_shutdown(client: httpx.AsyncClient) -> AsyncIterator[None]:
+    """Park until the event loop shuts down, then close the client.
+
+    asyncio.run() calls loop.shutdown_asyncgens() before closing the loop,
+    which finalizes this generator and releases the pooled connections.
+    """
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def _get_shared_async_client() -> httpx.AsyncClient:
+    """Return the shared async client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    entry = _shared_async_clients.get(loop)
+    if entry is not None and not entry[0].is_closed:
+        return entry[0]
+
+    if entry is not None:
+        await entry[1].aclose()
+    client = httpx.AsyncClient()
+    closer = _close_on_loop_shutdown(client)
+    await closer.__anext__()
+    _shared_async_clients[loop] = (client, closer)
+    return client
+
+
+@atexit.register
+def _close_shared_sync_client() -> None:
+    if _shared_sync_client is not None:
+        _shared_sync_client.close()
+
 
 async def check_if_auth_required(
     mcp_url: str, timeout: float = 5.0, httpx_kwargs: Optional[Dict[str, Any]] = None
@@ -40,57 +98,70 @@ async def check_if_auth_required(
         >>> await check_if_auth_required("http://localhost:8000/public")
         False  # 200 OK received
     """
-    httpx_kwargs = httpx_kwargs or {}
+    # Fail open: if the server doesn't respond or the check errors, assume
+    # auth is not required (better to allow attempt than block)
+    return bool(await _probe_auth_required(mcp_url, timeout, httpx_kwargs))
+
 
+async def _probe_auth_required(
+    mcp_url: str, timeout: float, httpx_kwargs: Optional[Dict[str, Any]]
+) -> Optional[bool]:
+    """
+    Send the auth check request for check_if_auth_required.
+
+    Returns:
+        True/False from the endpoint's response, or None if no response was
+        received (timeout, connection error, other failure)
+    """
     try:
-        async with httpx.AsyncClient(**httpx_kwargs) as client:
-            # Try a simple GET request to the MCP endpoint
+        # Try a simple GET request to the MCP endpoint
+        if httpx_kwargs:
+            async with httpx.AsyncClient(**httpx_kwargs) as client:
+                response = await client.get(
+                    mcp_url, timeout=timeout, follow_redirects=False
+                )
+        else:
+            client = await _get_shared_async_client()
             response = await client.get(
                 mcp_url, timeout=timeout, follow_redirects=False
             )
 
-            # Check status code for auth requirements
-            if response.status_code == 401:
-                logger.debug(f"Auth required for {mcp_url}: 401 Unauthorized")
-                return True
-
-            if response.status_code == 403:
-                logger.debug(f"Auth required for {mcp_url}: 403 Forbidden")
-                return True
-
-            # Check for WWW-Authenticate header (indicates auth required)
-            if "www-authenticate" in [h.lower() for h in response.headers.keys()]:
-                logger.debug(
-                    f"Auth required for {mcp_url}: WWW-Authenticate header present"
-                )
-                return True
+        # Check status code for auth requirements
+        if response.status_code in _AUTH_REQUIRED_STATUSES:
+            logger.debug(f"Auth required for {mcp_url}: {response.status_code}")
+            return True
+
+        # Check for WWW-Authenticate header (indicates auth required).
+        # httpx.Headers lookups are already case-insensitive.
+        headers = response.headers
+        if "www-authenticate" in headers:
+            logger.debug(
+                f"Auth required for {mcp_url}: WWW-Authenticate header present"
+            )
+            return True
 
-            # Check for Proxy-Authenticate header
-            if "proxy-authenticate" in [h.lower() for h in response.headers.keys()]:
-                logger.debug(
-                    f"Auth required for {mcp_url}: Proxy-Authenticate header present"
-                )
-                return True
+        # Check for Proxy-Authenticate header
+        if "proxy-authenticate" in headers:
+            logger.debug(
+                f"Auth required for {mcp_url}: Proxy-Authenticate header present"
+            )
+            return True
 
-            # Successful response, no auth needed
-            logger.debug(f"No auth required for {mcp_url}: {response.status_code}")
-            return False
+        # Successful response, no auth needed
+        logger.debug(f"No auth required for {mcp_url}: {response.status_code}")
+        return False
 
     except httpx.TimeoutException:
         logger.warning(f"Timeout checking auth requirement for {mcp_url}")
-        # Assume auth not required if server doesn't respond
-        # (better to allow attempt than block)
-        return False
+        return None
 
     except httpx.ConnectError as e:
         logger.warning(f"Connection error checking auth for {mcp_url}: {e}")
-        # Cannot determine, assume not required
-        return False
+        return None
 
     except Exception as e:
         logger.warning(f"Error checking auth requirement for {mcp_url}: {e}")
-        # On error, assume auth not required to allow attempt
-        return False
+        return None
 
 
 def check_if_auth_required_sync(
@@ -107,44 +178,128 @@ def check_if_auth_required_sync(
     Returns:
         True if auth appears to be required, False otherwise
     """
-    httpx_kwargs = httpx_kwargs or {}
+    # Fail open on errors, like check_if_auth_required
+    return bool(_probe_auth_required_sync(mcp_url, timeout, httpx_kwargs))
+
 
+def _probe_auth_required_sync(
+    mcp_url: str, timeout: float, httpx_kwargs: Optional[Dict[str, Any]]
+) -> Optional[bool]:
+    """Synchronous version of _probe_auth_required."""
     try:
-        with httpx.Client(**httpx_kwargs) as client:
-            response = client.get(mcp_url, timeout=timeout, follow_redirects=False)
+        if httpx_kwargs:
+            with httpx.Client(**httpx_kwargs) as client:
+                response = client.get(mcp_url, timeout=timeout, follow_redirects=False)
+        else:
+            response = _get_shared_sync_client().get(
+                mcp_url, timeout=timeout, follow_redirects=False
+            )
 
-            if response.status_code in [401, 403]:
-                logger.debug(f"Auth required for {mcp_url}: {response.status_code}")
-                return True
+        if response.status_code in _AUTH_REQUIRED_STATUSES:
+            logger.debug(f"Auth required for {mcp_url}: {response.status_code}")
+            return True
 
-            if "www-authenticate" in [h.lower() for h in response.headers.keys()]:
-                logger.debug(
-                    f"Auth required for {mcp_url}: WWW-Authenticate header present"
-                )
-                return True
+        if "www-authenticate" in response.headers:
+            logger.debug(
+                f"Auth required for {mcp_url}: WWW-Authenticate header present"
+            )
+            return True
 
-            logger.debug(f"No auth required for {mcp_url}: {response.status_code}")
-            return False
+        logger.debug(f"No auth required for {mcp_url}: {response.status_code}")
+        return False
 
     except httpx.TimeoutException:
         logger.warning(f"Timeout checking auth requirement for {mcp_url}")
-        return False
+        return None
 
     except httpx.ConnectError as e:
         logger.warning(f"Connection error checking auth for {mcp_url}: {e}")
-        return False
+        return None
 
     except Exception as e:
         logger.warning(f"Error checking auth requirement for {mcp_url}: {e}")
+        return None
+
+
+async def _cached_auth_required(auth_url: str, timeout: float) -> bool:
+    """Check auth requirement through the global cache, one request per URL at a time."""
+    cached = _auth_check_cache.get(auth_url)
+    if cached is not None:
+        return cached
+
+    # Concurrent first callers wait for a single check instead of each sending one
+    lock = _auth_check_locks.setdefault(auth_url, asyncio.Lock())
+    async with lock:
+        cached = _auth_check_cache.get(auth_url)
+        if cached is not None:
+            return cached
+
+        auth_needed = await _probe_auth_required(auth_url, timeout, None)
+        if auth_needed is None:
+            # No response: fail open for this call only, probe again next time
+            return False
+
+        _auth_check_cache.set(auth_url, auth_needed)
+        return auth_needed
+
+
+def _cached_auth_required_sync(auth_url: str, timeout: float) -> bool:
+    """Synchronous version of _cached_auth_required (no request coalescing)."""
+    cached = _auth_check_cache.get(auth_url)
+    if cached is not None:
+        return cached
+
+    auth_needed = _probe_auth_required_sync(auth_url, timeout, None)
+    if auth_needed is None:
+        # No response: fail open for this call only, probe again next time
         return False
 
+    _auth_check_cache.set(auth_url, auth_needed)
+    return auth_needed
+
+
+def _ensure_valid_tokens(auth_url: str, args: tuple, kwargs: dict) -> None:
+    """
+    Make sure the calling user has valid tokens for an endpoint requiring auth.
+
+    The auth modules are imported here, on the auth-required path only, so
+    decorated calls to endpoints without auth never load them.
+
+    Raises:
+        ValueError: If no user_email can be found in the call arguments
+        GoogleAuthenticationError: If the user has no valid tokens
+    """
+    from .retry_handler import _extract_user_email
+    from .token_storage_adapter import get_token_storage_adapter
+
+    # Extract user email from args/kwargs
+    user_email = _extract_user_email(args, kwargs)
+
+    if not user_email:
+        raise ValueError(
+            f"Authentication required for {auth_url}, but no user_email provided"
+        )
+
+    # Check if we have valid credentials
+    if not get_token_storage_adapter().has_valid_tokens(user_email):
+        # Prompt for authentication
+        from .error_messages import AuthErrorMessages
+        from .google_auth import GoogleAuthenticationError
+
+        guidance = AuthErrorMessages.token_expired(user_email, "MCP Service")
+        raise GoogleAuthenticationError(guidance.format())
+
+    logger.debug(f"Auth required and valid tokens found for {user_email}")
+
 
 def require_auth_if_needed(auth_url: str, check_timeout: float = 5.0):
     """
     Decorator to conditionally require authentication based on endpoint check.
 
     Checks if the endpoint requires authentication before executing the function.
-    If auth is required but not available, raises an appropriate error.
+    If auth is required but not available, raises an appropriate error. Check
+    results are shared through the global AuthCheckCache (see
+    get_auth_check_cache()), so the endpoint is not probed on every call.
 
     Args:
         auth_url: URL to check for auth requirements
@@ -163,91 +318,74 @@ def require_auth_if_needed(auth_url: str, check_timeout: float = 5.0):
     """
 
     def decorator(func):
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            # Check if auth required
-            auth_needed = await check_if_auth_required(auth_url, check_timeout)
-
-            if auth_needed:
-                # Extract user email from args/kwargs
-                from .retry_handler import _extract_user_email
-
-                user_email = _extract_user_email(args, kwargs)
-
-                if not user_email:
-                    raise ValueError(
-                        f"Authentication required for {auth_url}, but no user_email provided"
-                    )
-
-                # Check if we have valid credentials
-                from .token_storage_adapter import get_token_storage_adapter
-
-                adapter = get_token_storage_adapter()
-
-                if not adapter.has_valid_tokens(user_email):
-                    # Prompt for authentication
-                    from .error_messages import AuthErrorMessages
-
-                    guidance = AuthErrorMessages.token_expired(
-                        user_email, "MCP Service"
-                    )
-
-                    from .google_auth import GoogleAuthenticationError
+        # Only build the wrapper matching the function type
+        if asyncio.iscoroutinefunction(func):
 
-                    raise GoogleAuthenticationError(guidance.format())
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Check if auth required
+                if await _cached_auth_required(auth_url, check_timeout):
+                    _ensure_valid_tokens(auth_url, args, kwargs)
 
-                logger.debug(f"Auth required and valid tokens found for {user_email}")
+                # Proceed with function
+                return await func(*args, **kwargs)
 
-            # Proceed with function
-            return await func(*args, **kwargs)
+            return async_wrapper
 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             # Check if auth required (sync version)
-            auth_needed = check_if_auth_required_sync(auth_url, check_timeout)
-
-            if auth_needed:
-                from .retry_handler import _extract_user_email
-
-                user_email = _extract_user_email(args, kwargs)
-
-                if not user_email:
-                    raise ValueError(
-                        f"Authentication required for {auth_url}, but no user_email provided"
-                    )
-
-                from .token_storage_adapter import get_token_storage_adapter
+            if _cached_auth_required_sync(auth_url, check_timeout):
+                _ensure_valid_tokens(auth_url, args, kwargs)
 
-                adapter = get_token_storage_adapter()
-
-                if not adapter.has_valid_tokens(user_email):
-                    from .error_messages import AuthErrorMessages
-
-                    guidance = AuthErrorMessages.token_expired(
-                        user_email, "MCP Service"
-                    )
+            return func(*args, **kwargs)
 
-                    from .google_auth import GoogleAuthenticationError
+        return sync_wrapper
 
-                    raise GoogleAuthenticationError(guidance.format())
+    return decorator
 
-                logger.debug(f"Auth required and valid tokens found for {user_email}")
 
-            return func(*args, **kwargs)
+async def iter_endpoint_auth_status(
+    endpoints: Dict[str, str], timeout: float = 5.0, max_concurrency: int = 32
+) -> AsyncIterator[Tuple[str, bool]]:
+    """
+    Check multiple endpoints for auth requirements, yielding results as they finish.
 
-        # Return appropriate wrapper based on function type
-        import asyncio
+    Args:
+        endpoints: Dict mapping endpoint names to URLs
+        timeout: Timeout for each request (per endpoint)
+        max_concurrency: Maximum number of checks in flight at once
 
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        else:
-            return sync_wrapper
+    Yields:
+        (endpoint name, auth required) tuples in completion order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    return decorator
+    async def check_with_error_handling(name: str, url: str) -> Tuple[str, bool]:
+        """Check a single endpoint and return (name, result) tuple."""
+        async with semaphore:
+            try:
+                result = await check_if_auth_required(url, timeout)
+                return (name, result)
+            except Exception as e:
+                logger.error(f"Error checking {name}: {e}")
+                return (name, False)
+
+    tasks = [
+        asyncio.ensure_future(check_with_error_handling(name, url))
+        for name, url in endpoints.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Consumer stopped early: don't leave checks running
+        for task in tasks:
+            task.cancel()
 
 
 async def check_multiple_endpoints(
-    endpoints: Dict[str, str], timeout: float = 5.0
+    endpoints: Dict[str, str], timeout: float = 5.0, max_concurrency: int = 32
 ) -> Dict[str, bool]:
     """
     Check multiple endpoints for auth requirements in parallel.
@@ -255,6 +393,7 @@ async def check_multiple_endpoints(
     Args:
         endpoints: Dict mapping endpoint names to URLs
         timeout: Timeout for each request (per endpoint)
+        max_concurrency: Maximum number of checks in flight at once
 
     Returns:
         Dict mapping endpoint names to auth requirement (True/False)
@@ -269,28 +408,23 @@ async def check_multiple_endpoints(
         {'gmail': True, 'drive': True, 'calendar': False}
 
     Note:
-        All endpoints are checked concurrently using asyncio.gather(),
-        so total execution time is roughly one timeout period rather than
-        timeout * number of endpoints.
+        Endpoints are checked concurrently (at most max_concurrency at a time),
+        so with few endpoints total execution time is roughly one timeout
+        period rather than timeout * number of endpoints. Use
+        iter_endpoint_auth_status() to act on results as they arrive.
     """
+    # Pre-sized in the caller's endpoint order, filled in completion order
+    results = dict.fromkeys(endpoints, False)
+    async for name, auth_required in iter_endpoint_auth_status(
+        endpoints, timeout, max_concurrency
+    ):
+        results[name] = auth_required
 
-    async def check_with_error_handling(name: str, url: str) -> tuple[str, bool]:
-        """Check a single endpoint and return (name, result) tuple."""
-        try:
-            result = await check_if_auth_required(url, timeout)
-            return (name, result)
-        except Exception as e:
-            logger.error(f"Error checking {name}: {e}")
-            return (name, False)
-
-    # Create tasks for all endpoints and run them concurrently
-    tasks = [check_with_error_handling(name, url) for name, url in endpoints.items()]
+    return results
 
-    # Run all checks in parallel
-    endpoint_results = await asyncio.gather(*tasks)
 
-    # Convert list of tuples to dict
-    return dict(endpoint_results)
+# Optional "Bearer " scheme, then 20-2048 characters without spaces
+_BEARER_RE = re.compile(r"(?:Bearer )?([^ ]{20,2048})")
 
 
 def validate_bearer_token(token: str) -> bool:
@@ -303,27 +437,9 @@ def validate_bearer_token(token: str) -> bool:
     Returns:
         True if token format is valid, False otherwise
     """
-    if not token:
-        return False
-
-    # Remove "Bearer " prefix if present
-    if token.startswith("Bearer "):
-        token = token[7:]
-
-    # Basic validation
-    # - Must be non-empty
-    # - Must not contain spaces
-    # - Should be reasonable length (between 20 and 2048 characters)
-    if not token:
-        return False
-
-    if " " in token:
-        return False
-
-    if len(token) < 20 or len(token) > 2048:
-        return False
-
-    return True
+    # Must be non-empty, must not contain spaces and should be of
+    # reasonable length (between 20 and 2048 characters)
+    return bool(token) and _BEARER_RE.fullmatch(token) is not None
 
 
 def extract_bearer_token(auth_header: Optional[str]) -> Optional[str]:
@@ -349,21 +465,8 @@ def extract_bearer_token(auth_header: Optional[str]) -> Optional[str]:
     if not auth_header:
         return None
 
-    # Check for Bearer scheme
-    if auth_header.startswith("Bearer "):
-        token = auth_header[7:]
-
-        if validate_bearer_token(token):
-            return token
-
-        return None
-
-    # Try as raw token (no "Bearer " prefix)
-    if validate_bearer_token(auth_header):
-        return auth_header
-
-    # Not a valid Bearer token
-    return None
+    match = _BEARER_RE.fullmatch(auth_header)
+    return match.group(1) if match else None
 
 
 class AuthCheckCache:
@@ -380,9 +483,8 @@ class AuthCheckCache:
         Args:
             ttl_seconds: How long to cache results (default: 5 minutes)
         """
-        from datetime import datetime, timezone
-
-        self._cache: Dict[str, tuple[bool, datetime]] = {}
+        # url -> (auth_required, time.monotonic() when cached)
+        self._cache: Dict[str, tuple[bool, float]] = {}
         self._ttl = ttl_seconds
         self._lock = threading.Lock()
 
@@ -396,20 +498,19 @@ class AuthCheckCache:
         Returns:
             Cached result if valid, None if expired/not found
         """
-        from datetime import datetime, timedelta, timezone
+        # Single dict operations are atomic, so hits don't take the lock
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
 
-        with self._lock:
-            if url not in self._cache:
-                return None
+        result, cached_at = entry
 
-            result, cached_at = self._cache[url]
+        # Check if expired
+        if time.monotonic() - cached_at > self._ttl:
+            self._cache.pop(url, None)
+            return None
 
-            # Check if expired
-            if datetime.now(timezone.utc) - cached_at > timedelta(seconds=self._ttl):
-                del self._cache[url]
-                return None
-
-            return result
+        return result
 
     def set(self, url: str, auth_required: bool) -> None:
         """
@@ -419,10 +520,8 @@ class AuthCheckCache:
             url: URL that was checked
             auth_required: Whether auth is required
         """
-        from datetime import datetime, timezone
-
         with self._lock:
-            self._cache[url] = (auth_required, datetime.now(timezone.utc))
+            self._cache[url] = (auth_required, time.monotonic())
 
     def clear(self, url: Optional[str] = None) -> None:
         """
@@ -446,6 +545,9 @@ class AuthCheckCache:
 # Global auth check cache
 _auth_check_cache = AuthCheckCache()
 
+# Per-URL locks coalescing concurrent uncached checks in require_auth_if_needed
+_auth_check_locks: Dict[str, asyncio.Lock] = {}
+
 
 def get_auth_check_cache() -> AuthCheckCache:
     """Get the global auth check cache"""
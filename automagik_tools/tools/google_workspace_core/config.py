@@ -4,6 +4,7 @@ Google Workspace Core Configuration
 Base configuration class inherited by all Google Workspace tools.
 """
 
+import os
 from pathlib import Path
 from typing import Optional
 from pydantic import ConfigDict
@@ -50,3 +51,37 @@ class GoogleWorkspaceBaseConfig(BaseSettings):
         env_file_encoding="utf-8",
         extra="allow",
     )
+
+
+_BOOL_STR = {True: "true", False: "false"}
+
+
+def apply_config_env(config: GoogleWorkspaceBaseConfig) -> bool:
+    """Export a tool config as the environment variables read by the shared auth/server modules.
+
+    Also used by the standalone google_workspace tool, whose config has the
+    same fields. Returns True if any variable changed, so callers can skip
+    reloading the OAuth config when the environment already matches.
+    """
+    env = {
+        "GOOGLE_MCP_CREDENTIALS_DIR": os.path.expanduser(config.credentials_dir),
+        "MCP_ENABLE_OAUTH21": _BOOL_STR[config.enable_oauth21],
+        "MCP_SINGLE_USER_MODE": _BOOL_STR[config.single_user_mode],
+        "WORKSPACE_MCP_STATELESS_MODE": _BOOL_STR[config.stateless_mode],
+        "WORKSPACE_MCP_BASE_URI": config.base_uri,
+        "WORKSPACE_MCP_PORT": str(config.port),
+        "WORKSPACE_MCP_LOG_LEVEL": config.log_level,
+    }
+    # Unset values are left out rather than exported as "" over inherited ones
+    if config.user_email:
+        env["USER_GOOGLE_EMAIL"] = config.user_email
+    if config.client_id:
+        env["GOOGLE_OAUTH_CLIENT_ID"] = config.client_id
+    if config.client_secret:
+        env["GOOGLE_OAUTH_CLIENT_SECRET"] = config.client_secret
+
+    # Compared against os.environ itself: every Google tool exports the same variables
+    if all(os.environ.get(key) == value for key, value in env.items()):
+        return False
+    os.environ.update(env)
+    return True
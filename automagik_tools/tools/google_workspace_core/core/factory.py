@@ -0,0 +1,78 @@
+"""
+Server factory shared by the per-service Google Workspace tools.
+
+Every Google tool (google_gmail, google_drive, ...) configures the same core
+server; only the service name and the module registering its tools differ.
+"""
+
+import importlib
+from typing import Optional, Tuple
+
+from automagik_tools.tools.google_workspace_core.config import (
+    GoogleWorkspaceBaseConfig,
+    apply_config_env,
+)
+
+# (service, tools_module, config JSON) the shared core server is currently configured for
+_current_build: Optional[Tuple[str, str, str]] = None
+
+
+def build_server(config: GoogleWorkspaceBaseConfig, service: str, tools_module: str):
+    """
+    Configure the core server for a single Google service and return it.
+
+    Args:
+        config: Tool configuration (exported to the environment first)
+        service: Service name used for scope management (e.g. "gmail")
+        tools_module: Dotted path of the module whose import registers the tools
+
+    Returns:
+        Configured FastMCP server instance
+    """
+    global _current_build
+
+    # Environment must be in place before the OAuth config and server modules read it
+    apply_config_env(config)
+
+    # Same service and config as the last build (e.g. stdio + http, or a reload):
+    # the core server is already configured, and re-wrapping it would stack wrappers
+    build = (service, tools_module, config.model_dump_json())
+    if build == _current_build:
+        from automagik_tools.tools.google_workspace_core.core.server import server
+
+        return server
+
+    from automagik_tools.tools.google_workspace_core.auth.oauth_config import (
+        reload_oauth_config,
+    )
+
+    reload_oauth_config()
+
+    from automagik_tools.tools.google_workspace_core.core.server import (
+        server,
+        set_transport_mode,
+        configure_server_for_http,
+    )
+
+    set_transport_mode("stdio")
+
+    # Import the service tools to register them
+    importlib.import_module(tools_module)
+
+    from automagik_tools.tools.google_workspace_core.core.tool_registry import (
+        set_enabled_tools as set_enabled_tool_names,
+        wrap_server_tool_method,
+        filter_server_tools,
+    )
+    from automagik_tools.tools.google_workspace_core.auth.scopes import (
+        set_enabled_tools,
+    )
+
+    wrap_server_tool_method(server)
+    set_enabled_tools([service])
+    set_enabled_tool_names(None)  # Enable all tools of the service
+    filter_server_tools(server)
+    configure_server_for_http()
+
+    _current_build = build
+    return server
@@ -2,6 +2,7 @@
 Simple CLI tests that don't hang - focused on basic functionality
 """
 
+import os
 import sys
 import pytest
 from automagik_tools.cli import (
@@ -188,6 +189,65 @@ class TestDynamicOpenAPITool:
             client = call_args[1]["client"]
             assert client.base_url == "https://api.test.com"
 
+    def test_use_fast_event_loop_disabled_by_default(self):
+        """The default event loop is kept unless the fast loop is opted into"""
+        from automagik_tools.cli import use_fast_event_loop
+
+        with patch.dict(os.environ, {"AUTOMAGIK_TOOLS_FAST_EVENT_LOOP": "false"}):
+            with patch("asyncio.set_event_loop_policy") as mock_set_policy:
+                assert use_fast_event_loop() is False
+                mock_set_policy.assert_not_called()
+
+    @patch.dict(os.environ, {"AUTOMAGIK_TOOLS_FAST_EVENT_LOOP": "true"})
+    def test_use_fast_event_loop_without_uvloop(self):
+        """Servers keep the default loop when uvloop and eager tasks are unavailable"""
+        import asyncio
+        from automagik_tools.cli import use_fast_event_loop
+
+        with patch.dict(sys.modules, {"uvloop": None}):
+            with patch.object(asyncio, "eager_task_factory", None, create=True):
+                with patch("asyncio.set_event_loop_policy") as mock_set_policy:
+                    assert use_fast_event_loop() is False
+                    mock_set_policy.assert_not_called()
+
+    @patch.dict(os.environ, {"AUTOMAGIK_TOOLS_FAST_EVENT_LOOP": "true"})
+    def test_use_fast_event_loop_with_uvloop(self):
+        """uvloop's policy is installed when uvloop is importable"""
+        import asyncio
+        from automagik_tools.cli import use_fast_event_loop
+
+        fake_uvloop = MagicMock()
+        with patch.dict(sys.modules, {"uvloop": fake_uvloop}):
+            with patch.object(asyncio, "eager_task_factory", None, create=True):
+                with patch("asyncio.set_event_loop_policy") as mock_set_policy:
+                    assert use_fast_event_loop() is True
+                    mock_set_policy.assert_called_once_with(
+                        fake_uvloop.EventLoopPolicy.return_value
+                    )
+
+    @patch.dict(os.environ, {"AUTOMAGIK_TOOLS_FAST_EVENT_LOOP": "true"})
+    def test_use_fast_event_loop_eager_tasks(self):
+        """New loops get the eager task factory when asyncio provides one"""
+        import asyncio
+        from automagik_tools.cli import use_fast_event_loop
+
+        def eager_task_factory(loop, coro, **kwargs):
+            return asyncio.Task(coro, loop=loop, **kwargs)
+
+        with patch.dict(sys.modules, {"uvloop": None}):
+            with patch.object(
+                asyncio, "eager_task_factory", eager_task_factory, create=True
+            ):
+                with patch("asyncio.set_event_loop_policy") as mock_set_policy:
+                    assert use_fast_event_loop() is False
+
+        policy = mock_set_policy.call_args[0][0]
+        loop = policy.new_event_loop()
+        try:
+            assert loop.get_task_factory() is eager_task_factory
+        finally:
+            loop.close()
+
 
 # Mark all tests in this module as fast
 pytestmark = pytest.mark.unit
@@ -0,0 +1,139 @@
+"""
+Tests for the genie-omni broadcast_whatsapp tool
+"""
+
+import asyncio
+import importlib
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastmcp import FastMCP
+
+messaging = importlib.import_module("automagik_tools.tools.genie-omni.tools.messaging")
+OmniConfig = importlib.import_module(
+    "automagik_tools.tools.genie-omni.config"
+).OmniConfig
+
+
+def make_client(base_url="http://omni.test"):
+    """Mock OmniClient recording the send time of every text message"""
+    client = SimpleNamespace(
+        base_url=base_url, config=SimpleNamespace(api_key="test-key")
+    )
+    client.sent_at = []
+
+    async def send_text(instance_name, remote_jid, text, delay=None):
+        client.sent_at.append(asyncio.get_running_loop().time())
+        return {"key": {"id": f"id-{remote_jid}"}}
+
+    client.evolution_send_text = AsyncMock(side_effect=send_text)
+    return client
+
+
+async def get_broadcast(client, config):
+    mcp = FastMCP("test")
+    messaging.register_tools(mcp, lambda ctx=None: client, lambda ctx=None: config)
+    return (await mcp.get_tool("broadcast_whatsapp")).fn
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(messaging, "_broadcast_limiters", {})
+
+
+@pytest.fixture
+def config():
+    return OmniConfig(OMNI_BROADCAST_RATE_LIMIT=1000)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_deduplicates_recipients(config):
+    """Each recipient gets the message once, in the caller's order"""
+    client = make_client()
+    broadcast = await get_broadcast(client, config)
+
+    result = await broadcast(
+        to=["5511111111111", "5522222222222", "5511111111111"], message="hi"
+    )
+
+    assert result.splitlines()[0] == "📣 Broadcast: 2/2 sent"
+    sent_to = [
+        call.kwargs["remote_jid"] for call in client.evolution_send_text.await_args_list
+    ]
+    assert sorted(sent_to) == ["5511111111111", "5522222222222"]
+    assert result.splitlines()[1:] == [
+        "  ✅ 5511111111111: id-5511111111111",
+        "  ✅ 5522222222222: id-5522222222222",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_broadcast_rejects_too_many_recipients(config):
+    """More than MAX_BROADCAST_RECIPIENTS distinct recipients sends nothing"""
+    client = make_client()
+    broadcast = await get_broadcast(client, config)
+    recipients = [
+        f"55119{i:08d}" for i in range(messaging.MAX_BROADCAST_RECIPIENTS + 1)
+    ]
+
+    result = await broadcast(to=recipients, message="hi")
+
+    assert "too many recipients" in result
+    client.evolution_send_text.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_skips_invalid_and_blocked_recipients():
+    """Only recipients inside the master context with a valid format are sent to"""
+    client = make_client()
+    config = OmniConfig(
+        OMNI_MASTER_PHONE="5511111111111", OMNI_BROADCAST_RATE_LIMIT=1000
+    )
+    broadcast = await get_broadcast(client, config)
+
+    result = await broadcast(
+        to=["5511111111111", "5522222222222", "not a phone"], message="hi"
+    )
+
+    assert "📣 Broadcast: 1/3 sent" in result
+    assert "🚫 5522222222222: blocked by context isolation" in result
+    assert "⚠️ not a phone: invalid recipient format" in result
+    client.evolution_send_text.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_paced_by_rate_limit():
+    """Sends are spaced by 1/broadcast_rate_limit seconds"""
+    client = make_client()
+    config = OmniConfig(OMNI_BROADCAST_RATE_LIMIT=20, OMNI_BROADCAST_CONCURRENCY=5)
+    broadcast = await get_broadcast(client, config)
+
+    await broadcast(to=[f"551199999999{i}" for i in range(4)], message="hi")
+
+    gaps = [b - a for a, b in zip(client.sent_at, client.sent_at[1:])]
+    assert len(gaps) == 3
+    assert all(gap >= 0.04 for gap in gaps)
+
+
+def test_broadcast_limiter_scoped_by_server():
+    """Instances with the same name on different Omni servers get separate budgets"""
+    first = messaging._get_broadcast_limiter(make_client("http://a"), "genie", 10)
+    second = messaging._get_broadcast_limiter(make_client("http://b"), "genie", 10)
+
+    assert first is not second
+    assert first is messaging._get_broadcast_limiter(
+        make_client("http://a"), "genie", 10
+    )
+
+
+def test_recipient_validation_cache_is_bounded():
+    """validate_recipient keeps at most _RECIPIENT_CACHE_SIZE memoized results"""
+    config_module = importlib.import_module("automagik_tools.tools.genie-omni.config")
+    config = OmniConfig(OMNI_MASTER_PHONE="5511111111111")
+
+    for i in range(config_module._RECIPIENT_CACHE_SIZE + 10):
+        config.validate_recipient(f"55229{i:08d}")
+
+    assert len(config._recipient_cache) == config_module._RECIPIENT_CACHE_SIZE
+    assert config.validate_recipient("5511111111111")[0] is True
@@ -0,0 +1,159 @@
+"""
+Tests for the genie-omni WhatsApp contact/group snapshot cache
+"""
+
+import asyncio
+import importlib
+import os
+import sqlite3
+import stat
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from fastmcp import FastMCP
+
+cache_module = importlib.import_module("automagik_tools.tools.genie-omni.cache")
+discovery = importlib.import_module("automagik_tools.tools.genie-omni.tools.discovery")
+OmniConfig = importlib.import_module(
+    "automagik_tools.tools.genie-omni.config"
+).OmniConfig
+
+WhatsAppCache = cache_module.WhatsAppCache
+snapshot_key = cache_module.snapshot_key
+
+
+def make_client(contacts=None, groups=None):
+    """Mock OmniClient returning one page of contacts and the given groups"""
+    client = SimpleNamespace(
+        base_url="http://omni.test",
+        config=SimpleNamespace(api_key="test-key"),
+    )
+    client.list_contacts = AsyncMock(
+        return_value=SimpleNamespace(
+            contacts=[
+                SimpleNamespace(id=f"{phone}@s.whatsapp.net", name=name)
+                for phone, name in (contacts or [])
+            ],
+            has_more=False,
+        )
+    )
+    client.evolution_fetch_all_groups = AsyncMock(
+        return_value=[
+            {
+                "id": group_id,
+                "subject": name,
+                "participants": [
+                    {"id": f"{phone}@s.whatsapp.net"} for phone in members
+                ],
+            }
+            for group_id, name, members in (groups or [])
+        ]
+    )
+    return client
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "data" / "cache.db")
+
+
+def test_database_file_is_private(db_path):
+    """The snapshot file is created readable by the current user only"""
+    WhatsAppCache(db_path, ttl_seconds=600)
+
+    assert stat.S_IMODE(os.stat(db_path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(os.path.dirname(db_path)).st_mode) == 0o700
+
+
+def test_connections_are_closed(db_path):
+    """_connect closes the connection instead of leaking it"""
+    cache = WhatsAppCache(db_path, ttl_seconds=600)
+
+    with cache._connect() as db:
+        db.execute("SELECT 1")
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.execute("SELECT 1")
+
+
+@pytest.mark.asyncio
+async def test_first_call_blocks_on_full_fetch(db_path):
+    """Without a snapshot, ensure_fresh fetches and stores before returning"""
+    cache = WhatsAppCache(db_path, ttl_seconds=600)
+    client = make_client(
+        contacts=[("5511999999999", "Alice")],
+        groups=[("120363000000000001@g.us", "Team", ["5511888888888"])],
+    )
+
+    await cache.ensure_fresh(client, "genie")
+
+    contacts, groups = await cache.load_snapshot(snapshot_key(client, "genie"))
+    assert contacts == [("5511999999999", "Alice")]
+    assert groups == [("120363000000000001@g.us", "Team", ["5511888888888"])]
+    client.list_contacts.assert_awaited_once()
+    assert not cache._tasks
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_served_while_refreshing(db_path):
+    """A stale snapshot is returned at once and refreshed in the background"""
+    cache = WhatsAppCache(db_path, ttl_seconds=0)
+    client = make_client(contacts=[("5511999999999", "Alice")])
+    key = snapshot_key(client, "genie")
+    cache.store_snapshot(key, [("5511777777777", "Old")], [])
+
+    # Hold the refresh open until the stale reads are checked
+    release = asyncio.Event()
+    fetch_contacts = client.list_contacts.return_value
+
+    async def slow_list_contacts(**kwargs):
+        await release.wait()
+        return fetch_contacts
+
+    client.list_contacts.side_effect = slow_list_contacts
+
+    await cache.ensure_fresh(client, "genie")
+
+    assert await cache.load_snapshot(key) == ([("5511777777777", "Old")], [])
+    assert key in cache._refreshing
+
+    # A second stale call does not start another refresh
+    await cache.ensure_fresh(client, "genie")
+    assert len(cache._tasks) == 1
+
+    release.set()
+    await asyncio.gather(*cache._tasks)
+
+    assert await cache.load_snapshot(key) == ([("5511999999999", "Alice")], [])
+    assert key not in cache._refreshing
+    client.list_contacts.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_search_reads_from_snapshot(db_path, tmp_path, monkeypatch):
+    """search finds people, groups and members from the stored snapshot"""
+    monkeypatch.setenv("AUTOMAGIK_OMNI_SQLITE_DATABASE_PATH", str(tmp_path / "omni.db"))
+    monkeypatch.setattr(cache_module, "_caches", {})
+    config = OmniConfig(OMNI_CACHE_DB_PATH=db_path, OMNI_CACHE_TTL=600)
+    client = make_client()
+    cache = await cache_module.get_cache(db_path, 600)
+    cache.store_snapshot(
+        snapshot_key(client, "genie"),
+        [("5511999999999", "Alice Souza")],
+        [("120363000000000001@g.us", "Team 1", ["5511888888888"])],
+    )
+
+    mcp = FastMCP("test")
+    discovery.register_tools(mcp, lambda ctx=None: client, lambda ctx=None: config)
+    search = (await mcp.get_tool("search")).fn
+
+    by_name = await search(query="alice")
+    by_group = await search(query="team 1")
+    by_member = await search(query="+5511888")
+
+    assert "Alice Souza - 5511999999999" in by_name
+    assert "Team 1 - 120363000000000001@g.us" in by_group
+    assert "5511888888888" not in by_group
+    assert "Member of Team 1 - 5511888888888" in by_member
+    client.list_contacts.assert_not_awaited()
@@ -18,7 +18,10 @@ from automagik_tools.tools.google_workspace_core.core.tool_registry import (
     get_enabled_tools,
     is_tool_enabled,
 )
-from automagik_tools.tools.google_workspace_core.config import GoogleWorkspaceBaseConfig
+from automagik_tools.tools.google_workspace_core.config import (
+    GoogleWorkspaceBaseConfig,
+    apply_config_env,
+)
 
 
 class TestGoogleWorkspaceScopes:
@@ -146,6 +149,24 @@ class TestGoogleWorkspaceConfig:
         assert "port" in field_names
         assert "log_level" in field_names
 
+    def test_apply_config_env_reports_changes(self):
+        """apply_config_env exports the config once and reports no change after."""
+        import os
+        from unittest.mock import patch
+
+        config = GoogleWorkspaceBaseConfig.model_construct(
+            user_email="user@example.com", port=8123
+        )
+
+        with patch.dict(os.environ):
+            os.environ.pop("USER_GOOGLE_EMAIL", None)
+            assert apply_config_env(config) is True
+            assert os.environ["USER_GOOGLE_EMAIL"] == "user@example.com"
+            assert os.environ["WORKSPACE_MCP_PORT"] == "8123"
+            assert os.environ["MCP_SINGLE_USER_MODE"] == "true"
+
+            assert apply_config_env(config) is False
+
 
 class TestGoogleWorkspaceCoreModule:
     """Test the google_workspace_core module itself."""
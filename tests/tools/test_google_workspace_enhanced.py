@@ -362,9 +362,7 @@ class TestAuthChecker:
         mock_response.headers = {}
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
             result = await check_if_auth_required("http://test.com/mcp")
             assert result is True
@@ -377,9 +375,7 @@ class TestAuthChecker:
         mock_response.headers = {}
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
             result = await check_if_auth_required("http://test.com/mcp")
             assert result is True
@@ -389,12 +385,10 @@ class TestAuthChecker:
         """Test detection of auth requirement from WWW-Authenticate header."""
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.headers = {"WWW-Authenticate": "Bearer"}
+        mock_response.headers = httpx.Headers({"WWW-Authenticate": "Bearer"})
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
             result = await check_if_auth_required("http://test.com/mcp")
             assert result is True
@@ -407,9 +401,7 @@ class TestAuthChecker:
         mock_response.headers = {}
 
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
             result = await check_if_auth_required("http://test.com/mcp")
             assert result is False
@@ -418,7 +410,7 @@ class TestAuthChecker:
     async def test_auth_checker_timeout_assumes_not_required(self):
         """Test that timeout assumes auth not required (fail open)."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=httpx.TimeoutException("Timeout")
             )
 
@@ -429,7 +421,7 @@ class TestAuthChecker:
     async def test_auth_checker_connection_error(self):
         """Test that connection errors assume auth not required."""
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 side_effect=httpx.ConnectError("Connection refused")
             )
 
@@ -443,9 +435,7 @@ class TestAuthChecker:
         mock_response.headers = {}
 
         with patch("httpx.Client") as mock_client:
-            mock_client.return_value.__enter__.return_value.get = Mock(
-                return_value=mock_response
-            )
+            mock_client.return_value.get = Mock(return_value=mock_response)
 
             result = check_if_auth_required_sync("http://test.com/mcp")
             assert result is True
@@ -457,9 +447,7 @@ class TestAuthChecker:
         mock_response.headers = {}
 
         with patch("httpx.Client") as mock_client:
-            mock_client.return_value.__enter__.return_value.get = Mock(
-                return_value=mock_response
-            )
+            mock_client.return_value.get = Mock(return_value=mock_response)
 
             result = check_if_auth_required_sync("http://test.com/mcp")
             assert result is False
@@ -1000,6 +988,36 @@ class TestToolRegistry:
         assert not is_tool_enabled("other_tool")
 
 
+class TestVerifiedTokenCache:
+    """Test caching of verified bearer tokens in the auth middleware."""
+
+    def test_cached_verification_reused(self):
+        """Test a verified token is returned from the cache with its claims."""
+        from automagik_tools.tools.google_workspace_core.auth import (
+            auth_info_middleware as middleware,
+        )
+
+        verified = Mock(expires_at=int(time.time()) + 3600)
+        key = middleware._token_cache_key("token-reused")
+        middleware._remember_verified_token(key, verified, {"email": "a@b.com"})
+
+        assert middleware._get_verified_token(key) == (verified, {"email": "a@b.com"})
+        assert "token-reused" not in key
+        middleware._verified_tokens.pop(key, None)
+
+    def test_expired_token_not_cached(self):
+        """Test cache entries never outlive the token expiry."""
+        from automagik_tools.tools.google_workspace_core.auth import (
+            auth_info_middleware as middleware,
+        )
+
+        key = middleware._token_cache_key("token-expired")
+        expired = Mock(expires_at=int(time.time()) - 1)
+        middleware._remember_verified_token(key, expired, {})
+
+        assert middleware._get_verified_token(key) is None
+
+
 class TestOAuthResponseTypes:
     """Test OAuth response structures."""
 
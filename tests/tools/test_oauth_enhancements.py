@@ -45,6 +45,9 @@ from automagik_tools.tools.google_workspace_core.auth.auth_checker import (
     validate_bearer_token,
     extract_bearer_token,
     AuthCheckCache,
+    get_auth_check_cache,
+    require_auth_if_needed,
+    check_multiple_endpoints,
 )
 
 
@@ -374,9 +377,7 @@ async def test_check_if_auth_required_401():
         mock_response.status_code = 401
         mock_response.headers = {}
 
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-            return_value=mock_response
-        )
+        mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
         result = await check_if_auth_required("http://example.com/api")
 
@@ -391,9 +392,7 @@ async def test_check_if_auth_required_200():
         mock_response.status_code = 200
         mock_response.headers = {}
 
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-            return_value=mock_response
-        )
+        mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
         result = await check_if_auth_required("http://example.com/api")
 
@@ -408,15 +407,73 @@ async def test_check_if_auth_required_www_authenticate():
         mock_response.status_code = 200
         mock_response.headers = {"www-authenticate": "Bearer realm='example'"}
 
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-            return_value=mock_response
-        )
+        mock_client.return_value.get = AsyncMock(return_value=mock_response)
 
         result = await check_if_auth_required("http://example.com/api")
 
         assert result is True
 
 
+@pytest.mark.asyncio
+async def test_check_if_auth_required_reuses_client():
+    """Test repeated auth checks share one HTTP client"""
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+
+        mock_client.return_value.is_closed = False
+        mock_client.return_value.get = AsyncMock(return_value=mock_response)
+        mock_client.return_value.aclose = AsyncMock()
+
+        await check_if_auth_required("http://example.com/a")
+        await check_if_auth_required("http://example.com/b")
+
+        mock_client.assert_called_once()
+        assert mock_client.return_value.get.await_count == 2
+
+
+def test_shared_async_client_closed_on_loop_shutdown():
+    """Test the per-loop auth check client is closed when its event loop shuts down"""
+    import asyncio
+    from automagik_tools.tools.google_workspace_core.auth import auth_checker
+
+    client = asyncio.run(auth_checker._get_shared_async_client())
+
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_check_multiple_endpoints_bounded():
+    """Test endpoint checks respect max_concurrency and keep endpoint order"""
+    import asyncio
+
+    in_flight = 0
+    peak = 0
+
+    async def fake_check(url, timeout):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return url.endswith("/private")
+
+    endpoints = {f"svc{i}": f"http://example.com/{i}/public" for i in range(6)}
+    endpoints["gmail"] = "http://example.com/gmail/private"
+
+    with patch(
+        "automagik_tools.tools.google_workspace_core.auth.auth_checker.check_if_auth_required",
+        new=fake_check,
+    ):
+        results = await check_multiple_endpoints(endpoints, max_concurrency=2)
+
+    assert list(results) == list(endpoints)
+    assert results["gmail"] is True
+    assert results["svc0"] is False
+    assert peak == 2
+
+
 def test_validate_bearer_token_valid():
     """Test validating valid bearer tokens"""
     assert validate_bearer_token("Bearer FAKE_TEST_TOKEN_NOT_REAL") is True
@@ -478,6 +535,77 @@ def test_auth_check_cache_expiry():
     assert result is None  # Should be expired
 
 
+@pytest.mark.asyncio
+async def test_require_auth_if_needed_caches_check():
+    """Test decorator checks the endpoint once and reuses the cached result"""
+    import asyncio
+
+    url = "http://example.com/cached-check"
+    get_auth_check_cache().clear(url)
+
+    @require_auth_if_needed(url)
+    async def tool(user_email: str):
+        return user_email
+
+    async def slow_check(*args):
+        await asyncio.sleep(0.01)
+        return False
+
+    with patch(
+        "automagik_tools.tools.google_workspace_core.auth.auth_checker._probe_auth_required",
+        new=AsyncMock(side_effect=slow_check),
+    ) as mock_check:
+        results = await asyncio.gather(*(tool(user_email="a@b.com") for _ in range(5)))
+        await tool(user_email="a@b.com")
+
+    assert results == ["a@b.com"] * 5
+    mock_check.assert_awaited_once()
+    get_auth_check_cache().clear(url)
+
+
+@pytest.mark.asyncio
+async def test_require_auth_if_needed_does_not_cache_failed_check():
+    """Test a timed-out check fails open once and is probed again next call"""
+    import httpx
+
+    from automagik_tools.tools.google_workspace_core.auth.google_auth import (
+        GoogleAuthenticationError,
+    )
+
+    url = "http://example.com/flaky-check"
+    get_auth_check_cache().clear(url)
+
+    @require_auth_if_needed(url)
+    async def tool(user_email: str):
+        return user_email
+
+    with patch("httpx.AsyncClient") as mock_client:
+        mock_response = Mock()
+        mock_response.status_code = 401
+        mock_response.headers = {}
+
+        mock_client.return_value.is_closed = False
+        mock_client.return_value.get = AsyncMock(
+            side_effect=[httpx.TimeoutException("Timeout"), mock_response]
+        )
+
+        # Timeout: fail open without caching the result
+        assert await tool(user_email="a@b.com") == "a@b.com"
+        assert get_auth_check_cache().get(url) is None
+
+        # Next call probes again and now sees auth is required
+        with patch(
+            "automagik_tools.tools.google_workspace_core.auth.token_storage_adapter.get_token_storage_adapter"
+        ) as mock_adapter:
+            mock_adapter.return_value.has_valid_tokens.return_value = False
+            with pytest.raises(GoogleAuthenticationError):
+                await tool(user_email="a@b.com")
+
+    assert mock_client.return_value.get.await_count == 2
+    assert get_auth_check_cache().get(url) is True
+    get_auth_check_cache().clear(url)
+
+
 # ===== Integration Tests =====
 
 